@@ -1,5 +1,9 @@
 """Utility functions for ACP implementation."""
 
+import functools
+from collections.abc import Awaitable, Callable
+from typing import Any
+
 from acp import Client
 from acp.schema import (
     AgentMessageChunk,
@@ -92,6 +96,18 @@ def _event_visualize_to_plain(event: Event) -> str:
     return str(text)
 
 
+@functools.cache
+def _resolve_event_type(
+    event_type: type[Event], handled_types: frozenset[type[Event]]
+) -> type[Event] | None:
+    """Return the closest base of an event type that has a registered handler.
+
+    Walking the MRO keeps isinstance semantics for subclasses of handled
+    events; the result is cached so each concrete type is only resolved once.
+    """
+    return next((base for base in event_type.__mro__ if base in handled_types), None)
+
+
 class EventSubscriber:
     """Subscriber for handling OpenHands events and converting them to ACP
     notifications.
@@ -117,6 +133,24 @@ class EventSubscriber:
         self.conn = conn
         self.conversation = conversation
 
+        # Handler for each event type; None marks events that are skipped on
+        # purpose (ConversationStateUpdateEvent is internal state management)
+        self._event_handlers: dict[
+            type[Event], Callable[[Any], Awaitable[None]] | None
+        ] = {
+            ConversationStateUpdateEvent: None,
+            ActionEvent: self._handle_action_event,
+            ObservationEvent: self._handle_observation_event,
+            UserRejectObservation: self._handle_observation_event,
+            AgentErrorEvent: self._handle_observation_event,
+            MessageEvent: self._handle_message_event,
+            SystemPromptEvent: self._handle_system_prompt_event,
+            PauseEvent: self._handle_pause_event,
+            Condensation: self._handle_condensation_event,
+            CondensationRequest: self._handle_condensation_request_event,
+        }
+        self._handled_event_types = frozenset(self._event_handlers)
+
     def _format_status_line(self, usage, cost: float) -> str:
         """Format metrics as a status line string.
 
@@ -210,27 +244,12 @@ class EventSubscriber:
         Args:
             event: Event to process (ActionEvent, ObservationEvent, etc.)
         """
-        # Skip ConversationStateUpdateEvent (internal state management)
-        if isinstance(event, ConversationStateUpdateEvent):
+        event_type = _resolve_event_type(type(event), self._handled_event_types)
+        if event_type is None:
             return
-
-        # Handle different event types
-        if isinstance(event, ActionEvent):
-            await self._handle_action_event(event)
-        elif isinstance(
-            event, ObservationEvent | UserRejectObservation | AgentErrorEvent
-        ):
-            await self._handle_observation_event(event)
-        elif isinstance(event, MessageEvent):
-            await self._handle_message_event(event)
-        elif isinstance(event, SystemPromptEvent):
-            await self._handle_system_prompt_event(event)
-        elif isinstance(event, PauseEvent):
-            await self._handle_pause_event(event)
-        elif isinstance(event, Condensation):
-            await self._handle_condensation_event(event)
-        elif isinstance(event, CondensationRequest):
-            await self._handle_condensation_request_event(event)
+        handler = self._event_handlers[event_type]
+        if handler is not None:
+            await handler(event)
 
     async def _handle_action_event(self, event: ActionEvent):
         """Handle ActionEvent: send thought as agent_message_chunk, then tool_call.
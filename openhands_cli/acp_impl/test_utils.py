@@ -14,27 +14,64 @@ Usage:
         timeout_per_message=5.0,
         verbose=True,
     )
+
+    # Reuse one server process across several batches of messages
+    from openhands_cli.acp_impl.test_utils import JsonRpcSession
+
+    with JsonRpcSession("./dist/openhands", ["acp"]) as session:
+        success, responses = session.send(messages)
 """
 
 import json
 import os
-import select
+import selectors
 import subprocess
 import time
 from typing import Any
 
 
+# orjson is installed with the SDK's dependencies; fall back to the stdlib if absent
+try:
+    import orjson
+
+    def _dumps(message: Any) -> bytes:
+        return orjson.dumps(message)
+
+    _loads = orjson.loads
+except ImportError:
+
+    def _dumps(message: Any) -> bytes:
+        return json.dumps(message, separators=(",", ":")).encode("utf-8")
+
+    _loads = json.loads
+
+
 class UnbufferedJsonRpcReader:
     """Read JSON-RPC messages from a subprocess using unbuffered I/O.
 
     Uses raw bytes mode with os.read() to avoid Python's text buffering issues
     that can cause messages to get stuck in buffers.
+
+    The reader holds a selector (an OS file descriptor) until close() is
+    called; use it as a context manager to release it automatically.
     """
 
     def __init__(self, stdout):
         self.stdout = stdout
-        self.buffer = b""
+        self.buffer = bytearray()
         self.fd = stdout.fileno()
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.fd, selectors.EVENT_READ)
+
+    def close(self) -> None:
+        """Release the selector watching stdout."""
+        self.selector.close()
+
+    def __enter__(self) -> "UnbufferedJsonRpcReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
 
     def read_message(self, timeout: float = 5.0) -> dict[str, Any] | None:
         """Read a single JSON-RPC message (one line) from stdout.
@@ -45,32 +82,48 @@ class UnbufferedJsonRpcReader:
         Returns:
             Parsed JSON dict, or None if timeout/error
         """
-        deadline = time.time() + timeout
+        deadline = time.monotonic() + timeout
 
-        while time.time() < deadline:
+        while True:
             # Check if we already have a complete line in the buffer
-            if b"\n" in self.buffer:
-                line, self.buffer = self.buffer.split(b"\n", 1)
+            newline = self.buffer.find(b"\n")
+            if newline != -1:
+                line = bytes(self.buffer[:newline])
+                del self.buffer[: newline + 1]
                 if line:
-                    return json.loads(line.decode("utf-8"))
+                    return _loads(line)
                 continue
 
-            # Wait for more data
-            remaining = deadline - time.time()
+            # Block until more data arrives or the deadline expires
+            remaining = deadline - time.monotonic()
             if remaining <= 0:
                 break
 
-            rlist, _, _ = select.select([self.stdout], [], [], min(0.5, remaining))
-            if rlist:
-                chunk = os.read(self.fd, 65536)
-                if chunk:
-                    self.buffer += chunk
-                else:
-                    break  # EOF
+            if not self.selector.select(remaining):
+                break  # Timeout
+
+            chunk = os.read(self.fd, 65536)
+            if chunk:
+                self.buffer.extend(chunk)
+            else:
+                break  # EOF
 
         return None
 
 
+def _encode_message(message: dict[str, Any]) -> bytes:
+    """Serialize a JSON-RPC message as a compact newline-terminated frame."""
+    return _dumps(message) + b"\n"
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """Write all of data to a file descriptor, handling partial writes."""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
 def send_jsonrpc_and_wait(
     proc: subprocess.Popen,
     message: dict[str, Any],
@@ -93,7 +146,9 @@ def send_jsonrpc_and_wait(
         reader: Optional reader to reuse (for buffering between calls)
 
     Returns:
-        tuple of (success, response, error_message, reader)
+        tuple of (success, response, error_message, reader). When no reader
+        was passed in, the returned one is created here and the caller must
+        close it (or use it as a context manager).
     """
     if not proc.stdin or not proc.stdout:
         return False, None, "stdin or stdout not available", None
@@ -102,11 +157,9 @@ def send_jsonrpc_and_wait(
     if reader is None:
         reader = UnbufferedJsonRpcReader(proc.stdout)
 
-    # Send message
+    # Send message straight to the pipe, bypassing Python's write buffering
     try:
-        msg_bytes = (json.dumps(message) + "\n").encode("utf-8")
-        proc.stdin.write(msg_bytes)
-        proc.stdin.flush()
+        _write_all(proc.stdin.fileno(), _encode_message(message))
     except Exception as e:
         return False, None, f"Failed to send message: {e}", reader
 
@@ -114,16 +167,17 @@ def send_jsonrpc_and_wait(
     request_id = message.get("id")
 
     # Wait for response, skipping notifications
-    deadline = time.time() + timeout
-    while time.time() < deadline:
+    deadline = time.monotonic() + timeout
+    while True:
         if proc.poll() is not None:
             return False, None, "Process terminated unexpectedly", reader
 
-        remaining = deadline - time.time()
+        remaining = deadline - time.monotonic()
         if remaining <= 0:
             break
 
-        response = reader.read_message(timeout=min(1.0, remaining))
+        # Cap the wait so a dead process is still noticed during long requests
+        response = reader.read_message(timeout=min(2.0, remaining))
         if response is None:
             continue
 
@@ -158,6 +212,117 @@ def send_jsonrpc_and_wait(
     return False, None, "Response timeout", reader
 
 
+def _send_all(proc: subprocess.Popen, messages: list[dict[str, Any]]) -> None:
+    """Write several JSON-RPC messages to the subprocess in a single write."""
+    assert proc.stdin is not None
+    _write_all(proc.stdin.fileno(), b"".join(_encode_message(m) for m in messages))
+
+
+def _reap_responses(
+    proc: subprocess.Popen,
+    reader: UnbufferedJsonRpcReader,
+    request_ids: list[Any],
+    timeout: float,
+    verbose: bool = False,
+) -> dict[Any, dict[str, Any]]:
+    """Collect responses for the given request ids, skipping notifications.
+
+    Returns:
+        Mapping of request id to response for every response received before
+        the deadline expired or the process exited
+    """
+    pending = set(request_ids)
+    responses: dict[Any, dict[str, Any]] = {}
+
+    deadline = time.monotonic() + timeout
+    while pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+
+        response = reader.read_message(timeout=min(2.0, remaining))
+        if response is None:
+            # Only give up on an exited process once its output is drained
+            if proc.poll() is not None:
+                break
+            continue
+
+        if "id" not in response:
+            if verbose and "method" in response:
+                print(f"  📬 Notification received: {response['method']} (skipping)")
+            continue
+
+        if response["id"] in pending:
+            pending.discard(response["id"])
+            responses[response["id"]] = response
+        elif verbose:
+            print(f"  ⚠️  Unexpected response id: {response['id']}")
+
+    return responses
+
+
+def send_jsonrpc_batch_and_wait(
+    proc: subprocess.Popen,
+    messages: list[dict[str, Any]],
+    timeout: float = 5.0,
+    verbose: bool = False,
+    reader: UnbufferedJsonRpcReader | None = None,
+) -> tuple[
+    list[tuple[bool, dict[str, Any] | None, str]], UnbufferedJsonRpcReader | None
+]:
+    """
+    Send several JSON-RPC messages at once and wait for all their responses.
+
+    Responses are matched to requests by id, so the server may answer them in
+    any order. Messages without an 'id' are notifications: they are sent but
+    no response is awaited, and their result is (True, None, "").
+
+    Args:
+        proc: The subprocess to communicate with
+        messages: JSON-RPC request dicts
+        timeout: Timeout in seconds for the whole batch
+        verbose: Print verbose output for debugging
+        reader: Optional reader to reuse (for buffering between calls)
+
+    Returns:
+        tuple of (results, reader) where results holds one
+        (success, response, error_message) tuple per message, in order. When
+        no reader was passed in, the returned one is created here and the
+        caller must close it (or use it as a context manager).
+    """
+    if not proc.stdin or not proc.stdout:
+        return [(False, None, "stdin or stdout not available")] * len(messages), None
+
+    if reader is None:
+        reader = UnbufferedJsonRpcReader(proc.stdout)
+
+    try:
+        _send_all(proc, messages)
+    except Exception as e:
+        return [(False, None, f"Failed to send message: {e}")] * len(messages), reader
+
+    request_ids = [m["id"] for m in messages if "id" in m]
+    responses = _reap_responses(proc, reader, request_ids, timeout, verbose=verbose)
+
+    missing_error = (
+        "Process terminated unexpectedly"
+        if proc.poll() is not None
+        else "Response timeout"
+    )
+    results: list[tuple[bool, dict[str, Any] | None, str]] = []
+    for message in messages:
+        if "id" not in message:
+            # Notifications get no response
+            results.append((True, None, ""))
+            continue
+        response = responses.get(message["id"])
+        if response is None:
+            results.append((False, None, missing_error))
+        else:
+            results.append((True, response, ""))
+    return results, reader
+
+
 def validate_jsonrpc_response(response: dict[str, Any]) -> tuple[bool, str]:
     """
     Validate a JSON-RPC response for errors.
@@ -180,81 +345,171 @@ def validate_jsonrpc_response(response: dict[str, Any]) -> tuple[bool, str]:
     return True, ""
 
 
+class JsonRpcSession:
+    """A JSON-RPC server subprocess kept alive across batches of messages.
+
+    Spawning the server dominates the cost of short test sequences, so
+    suites that exercise several scenarios can start it once and send each
+    batch through the same process.
+
+    Usage:
+        with JsonRpcSession("./dist/openhands", ["acp"]) as session:
+            success, responses = session.send(messages)
+    """
+
+    def __init__(
+        self, executable_path: str, args: list[str], verbose: bool = True
+    ) -> None:
+        self.executable_path = executable_path
+        self.args = args
+        self.verbose = verbose
+        self.proc: subprocess.Popen | None = None
+        # Reuse reader to maintain buffer between messages
+        self.reader: UnbufferedJsonRpcReader | None = None
+
+    def __enter__(self) -> "JsonRpcSession":
+        if self.verbose:
+            print(f"🚀 Starting: {self.executable_path} {' '.join(self.args)}")
+
+        self.proc = subprocess.Popen(
+            [self.executable_path] + self.args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,  # Don't pipe stderr to avoid buffer blocking
+            text=False,  # Use bytes mode for unbuffered I/O
+            bufsize=0,  # Unbuffered
+        )
+        assert self.proc.stdout is not None
+        self.reader = UnbufferedJsonRpcReader(self.proc.stdout)
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+
+        if self.proc is None:
+            return
+
+        if self.verbose:
+            print("\n🛑 Terminating process...")
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        self.proc = None
+
+    def send(
+        self,
+        messages: list[dict[str, Any]],
+        timeout_per_message: float = 5.0,
+        pipeline: int = 1,
+    ) -> tuple[bool, list[dict[str, Any]]]:
+        """
+        Send messages to the running server and validate the responses.
+
+        Args:
+            messages: List of JSON-RPC messages to send
+            timeout_per_message: Timeout in seconds for each message
+            pipeline: Maximum number of requests in flight at once. The
+                default of 1 waits for each response before sending the next
+                message, which is required when later requests depend on
+                earlier ones (e.g. ACP's initialize before session/new).
+                Larger values send messages in batches; responses are
+                matched by id, so messages without one are sent as
+                notifications and not waited for.
+
+        Returns:
+            tuple of (success: bool, responses: list[dict])
+        """
+        if self.proc is None:
+            raise RuntimeError("JsonRpcSession.send() called outside 'with' block")
+
+        verbose = self.verbose
+        pipeline = max(1, pipeline)
+
+        all_responses = []
+        all_passed = True
+
+        for start in range(0, len(messages), pipeline):
+            batch = messages[start : start + pipeline]
+
+            if verbose:
+                for i, msg in enumerate(batch, start + 1):
+                    print(
+                        f"\n📤 Message {i}/{len(messages)}: "
+                        f"{msg.get('method', 'unknown')}"
+                    )
+
+            if len(batch) == 1:
+                success, response, error, self.reader = send_jsonrpc_and_wait(
+                    self.proc,
+                    batch[0],
+                    timeout_per_message,
+                    verbose=verbose,
+                    reader=self.reader,
+                )
+                results = [(success, response, error)]
+            else:
+                results, self.reader = send_jsonrpc_batch_and_wait(
+                    self.proc,
+                    batch,
+                    timeout_per_message * len(batch),
+                    verbose=verbose,
+                    reader=self.reader,
+                )
+
+            for success, response, error in results:
+                if not success:
+                    if verbose:
+                        print(f"❌ {error}")
+                    all_passed = False
+                    continue
+
+                if response:
+                    all_responses.append(response)
+
+                    if verbose:
+                        print(f"📥 Response: {json.dumps(response)}")
+
+                    is_valid, error_msg = validate_jsonrpc_response(response)
+                    if not is_valid:
+                        if verbose:
+                            print(f"❌ {error_msg}")
+                        all_passed = False
+                    elif verbose:
+                        print("✅ Success")
+
+        return all_passed, all_responses
+
+
 def test_jsonrpc_messages(
     executable_path: str,
     args: list[str],
     messages: list[dict[str, Any]],
     timeout_per_message: float = 5.0,
     verbose: bool = True,
+    pipeline: int = 1,
 ) -> tuple[bool, list[dict[str, Any]]]:
     """
     Test a JSON-RPC server by sending messages and validating responses.
 
+    Starts a fresh server process for this call; use JsonRpcSession directly
+    to send several batches to the same process.
+
     Args:
         executable_path: Path to the executable
         args: Command-line arguments for the executable
         messages: List of JSON-RPC messages to send
         timeout_per_message: Timeout in seconds for each message
         verbose: Print detailed output
+        pipeline: Maximum number of requests in flight at once (see
+            JsonRpcSession.send)
 
     Returns:
         tuple of (success: bool, responses: list[dict])
     """
-    if verbose:
-        print(f"🚀 Starting: {executable_path} {' '.join(args)}")
-
-    proc = subprocess.Popen(
-        [executable_path] + args,
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.DEVNULL,  # Don't pipe stderr to avoid buffer blocking
-        text=False,  # Use bytes mode for unbuffered I/O
-        bufsize=0,  # Unbuffered
-    )
-
-    all_responses = []
-    all_passed = True
-    reader = None  # Reuse reader to maintain buffer between messages
-
-    try:
-        for i, msg in enumerate(messages, 1):
-            if verbose:
-                print(
-                    f"\n📤 Message {i}/{len(messages)}: {msg.get('method', 'unknown')}"
-                )
-
-            success, response, error, reader = send_jsonrpc_and_wait(
-                proc, msg, timeout_per_message, verbose=verbose, reader=reader
-            )
-
-            if not success:
-                if verbose:
-                    print(f"❌ {error}")
-                all_passed = False
-                continue
-
-            if response:
-                all_responses.append(response)
-
-                if verbose:
-                    print(f"📥 Response: {json.dumps(response)}")
-
-                is_valid, error_msg = validate_jsonrpc_response(response)
-                if not is_valid:
-                    if verbose:
-                        print(f"❌ {error_msg}")
-                    all_passed = False
-                elif verbose:
-                    print("✅ Success")
-
-        return all_passed, all_responses
-
-    finally:
-        if verbose:
-            print("\n🛑 Terminating process...")
-        proc.terminate()
-        try:
-            proc.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            proc.kill()
-            proc.wait()
+    with JsonRpcSession(executable_path, args, verbose=verbose) as session:
+        return session.send(messages, timeout_per_message, pipeline=pipeline)
@@ -1,7 +1,6 @@
 """Utility functions for ACP implementation."""
 
 import base64
-from uuid import uuid4
 
 from acp.schema import (
     AudioContentBlock as ACPAudioContentBlock,
@@ -13,9 +12,12 @@ from acp.schema import (
 
 from openhands.sdk import ImageContent, TextContent
 from openhands_cli.acp_impl.utils.resources import (
-    ACP_CACHE_DIR,
+    _IMAGE_MIME_ALIASES,
+    _SUPPORTED_IMAGE_MIME_TYPES_STR,
     SUPPORTED_IMAGE_MIME_TYPES,
     _convert_image_to_supported_format,
+    _ensure_cache_dir,
+    _unique_cache_filename,
     convert_resources_to_content,
 )
 
@@ -35,9 +37,11 @@ def _convert_image_block(block: ACPImageContentBlock) -> TextContent | ImageCont
     Returns:
         ImageContent if format is supported or convertible, TextContent otherwise
     """
+    mime_type = _IMAGE_MIME_ALIASES.get(block.mimeType, block.mimeType)
+
     # Handle supported formats directly
-    if block.mimeType in SUPPORTED_IMAGE_MIME_TYPES:
-        return ImageContent(image_urls=[f"data:{block.mimeType};base64,{block.data}"])
+    if mime_type in SUPPORTED_IMAGE_MIME_TYPES:
+        return ImageContent(image_urls=[f"data:{mime_type};base64,{block.data}"])
 
     # Try to convert unsupported formats
     data = base64.b64decode(block.data)
@@ -48,17 +52,16 @@ def _convert_image_block(block: ACPImageContentBlock) -> TextContent | ImageCont
         return ImageContent(image_urls=[f"data:{target_mime};base64,{converted_data}"])
 
     # Conversion failed - save to disk and return explanatory text
-    filename = f"image_{uuid4().hex}"
-    target = ACP_CACHE_DIR / filename
+    filename = _unique_cache_filename("image")
+    target = _ensure_cache_dir() / filename
     target.write_bytes(data)
-    supported = ", ".join(sorted(SUPPORTED_IMAGE_MIME_TYPES))
 
     return TextContent(
         text=(
             "\n[BEGIN USER PROVIDED ADDITIONAL CONTEXT]\n"
             f"User provided image with unsupported format ({block.mimeType}).\n"
             "Attempted automatic conversion failed.\n"
-            f"Supported formats: {supported}\n"
+            f"Supported formats: {_SUPPORTED_IMAGE_MIME_TYPES_STR}\n"
             f"Saved to file: {str(target)}\n"
             "[END USER PROVIDED ADDITIONAL CONTEXT]\n"
         )
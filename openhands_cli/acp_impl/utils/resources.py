@@ -1,10 +1,15 @@
 """Utility functions for ACP implementation."""
 
 import base64
+import binascii
+import functools
 import io
+import itertools
 import mimetypes
+import os
+import re
 from pathlib import Path
-from uuid import uuid4
+from typing import TYPE_CHECKING
 
 from acp.schema import (
     BlobResourceContents as ACPBlobResourceContents,
@@ -12,12 +17,15 @@ from acp.schema import (
     ResourceContentBlock as ACPResourceContentBlock,
     TextResourceContents as ACPTextResourceContents,
 )
-from PIL import Image
 
 from openhands.sdk import ImageContent, TextContent
 from openhands.sdk.context import Skill
 
 
+if TYPE_CHECKING:
+    from PIL import Image
+
+
 RESOURCE_SKILL = Skill(
     name="user_provided_resources",
     content=(
@@ -36,34 +44,259 @@ RESOURCE_SKILL = Skill(
 )
 
 ACP_CACHE_DIR = Path.home() / ".openhands" / "cache" / "acp"
-ACP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+# Whether ACP_CACHE_DIR has been created by this process
+_cache_dir_ready = False
+# Sequence number making cache filenames unique within this process
+_cache_file_counter = itertools.count()
 
 # LLM API supported image MIME types (Anthropic/Claude compatible)
-SUPPORTED_IMAGE_MIME_TYPES = {
-    "image/jpeg",
-    "image/png",
-    "image/gif",
-    "image/webp",
+SUPPORTED_IMAGE_MIME_TYPES = frozenset(
+    {
+        "image/jpeg",
+        "image/png",
+        "image/gif",
+        "image/webp",
+    }
+)
+# Non-canonical MIME types that clients report for supported formats
+_IMAGE_MIME_ALIASES = {
+    "image/jpg": "image/jpeg",
+    "image/pjpeg": "image/jpeg",
+    "image/x-png": "image/png",
 }
+# Listing shown to the user when an image cannot be converted
+_SUPPORTED_IMAGE_MIME_TYPES_STR = ", ".join(sorted(SUPPORTED_IMAGE_MIME_TYPES))
+
+_TEXT_RESOURCE_TEMPLATE = (
+    "\n[BEGIN USER PROVIDED ADDITIONAL CONTEXT]\n"
+    "URI: {uri}\n"
+    "mimeType: {mime_type}\n"
+    "Content:\n"
+    "{text}\n"
+    "[END USER PROVIDED ADDITIONAL CONTEXT]\n"
+)
+
+_RESOURCE_LINK_TEMPLATE = (
+    "\n[BEGIN USER PROVIDED ADDITIONAL RESOURCE]\n"
+    "Type: {type}\n"
+    "URI: {uri}\n"
+    "name: {name}\n"
+    "mimeType: {mime_type}\n"
+    "size: {size}\n"
+    "[END USER PROVIDED ADDITIONAL RESOURCE]\n"
+)
+
+# Pillow decoders for image MIME types that need conversion
+_MIME_TO_PIL_FORMATS: dict[str, tuple[str, ...]] = {
+    "image/bmp": ("BMP",),
+    "image/x-ms-bmp": ("BMP",),
+    "image/tiff": ("TIFF",),
+    "image/x-icon": ("ICO",),
+    "image/vnd.microsoft.icon": ("ICO",),
+    "image/x-portable-pixmap": ("PPM",),
+    "image/x-tga": ("TGA",),
+}
+
+# Number of base64 characters decoded at a time when writing blobs to disk
+_BASE64_CHUNK_CHARS = 4 * 64 * 1024
+# Characters base64.b64decode discards before decoding
+_NON_BASE64_CHARS_RE = re.compile(r"[^A-Za-z0-9+/=]")
+_BASE64_PADDING_RE = re.compile("=+")
+
+# Leading bytes identifying each supported image format
+_IMAGE_MAGIC_NUMBERS: tuple[tuple[bytes, str], ...] = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+def _detect_image_mime_type(header: bytes) -> str | None:
+    """
+    Identify a supported image format from its leading bytes.
+
+    Args:
+        header: The first bytes of the image (at least 12 for WebP detection)
+
+    Returns:
+        The canonical MIME type if the header matches a supported format,
+        None otherwise
+    """
+    for magic, mime_type in _IMAGE_MAGIC_NUMBERS:
+        if header.startswith(magic):
+            return mime_type
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def _sniff_base64_image_mime_type(blob: str) -> str | None:
+    """
+    Identify a supported image format by decoding only the head of a base64 blob.
+
+    Returns:
+        The canonical MIME type, or None if the blob prefix could not be
+        decoded or does not match a supported format
+    """
+    try:
+        # 24 base64 characters decode to 18 bytes, enough for every magic number
+        header = base64.b64decode(blob[:24])
+    except (binascii.Error, ValueError):
+        return None
+    return _detect_image_mime_type(header)
+
+
+def _ensure_cache_dir() -> Path:
+    """Create the ACP cache directory on first use and return it."""
+    global _cache_dir_ready
+    if not _cache_dir_ready:
+        ACP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _cache_dir_ready = True
+    return ACP_CACHE_DIR
+
+
+def _unique_cache_filename(prefix: str, ext: str = "") -> str:
+    """
+    Build a filename that is unique within the ACP cache directory.
+
+    The process id and a per-process counter guarantee uniqueness within a
+    run; a short random suffix guards against reused process ids.
+    """
+    sequence = next(_cache_file_counter)
+    return f"{prefix}_{os.getpid()}_{sequence}_{os.urandom(4).hex()}{ext}"
+
+
+@functools.lru_cache(maxsize=256)
+def _guess_extension(mime_type: str) -> str:
+    """Return the file extension for a MIME type, or an empty string."""
+    return mimetypes.guess_extension(mime_type) or ""
+
+
+def _strip_base64_padding(
+    quad_pos: int, piece: str, pads: int
+) -> tuple[str, int, bool]:
+    """
+    Drop padding from a piece of base64 text the way base64.b64decode does.
+
+    Padding is ignored unless it completes the current 4-character quantum,
+    in which case it ends the encoded data and the rest of the input is
+    ignored.
+
+    Args:
+        quad_pos: Data characters already pending in the current quantum
+        piece: Base64 text holding only alphabet and padding characters
+        pads: Padding characters seen since the last data character
+
+    Returns:
+        A tuple of (data characters up to the end of the encoded data,
+        padding characters seen since the last data character, whether
+        padding ended the encoded data)
+    """
+    parts: list[str] = []
+    data_start = 0
+    for match in _BASE64_PADDING_RE.finditer(piece):
+        data = piece[data_start : match.start()]
+        if data:
+            pads = 0
+        parts.append(data)
+        quad_pos = (quad_pos + len(data)) % 4
+        pads += len(match.group())
+        if quad_pos >= 2 and quad_pos + pads >= 4:
+            return "".join(parts), pads, True
+        data_start = match.end()
+
+    data = piece[data_start:]
+    if data:
+        pads = 0
+    parts.append(data)
+    return "".join(parts), pads, False
+
+
+def _write_base64_to_file(blob: str, target: Path) -> None:
+    """
+    Decode a base64 string into a file chunk by chunk.
+
+    Peak memory stays proportional to the chunk size instead of the decoded
+    payload. The output matches base64.b64decode: characters outside the
+    base64 alphabet are discarded, and padding that completes a quantum ends
+    the encoded data.
+
+    Raises:
+        binascii.Error: If the blob is not valid base64. The partially
+            written file is removed.
+    """
+    # Data characters not yet forming a whole quantum, and the padding
+    # characters seen since the last data character
+    carry = ""
+    pads = 0
+    try:
+        with open(target, "wb") as f:
+            for start in range(0, len(blob), _BASE64_CHUNK_CHARS):
+                piece = _NON_BASE64_CHARS_RE.sub(
+                    "", blob[start : start + _BASE64_CHUNK_CHARS]
+                )
+                data, pads, padded = _strip_base64_padding(len(carry), piece, pads)
+                chunk = carry + data
+                if padded:
+                    f.write(base64.b64decode(chunk + "=" * (-len(chunk) % 4)))
+                    carry = ""
+                    break
+                # Only decode whole 4-character quanta; keep the rest for later
+                usable = len(chunk) - len(chunk) % 4
+                carry = chunk[usable:]
+                f.write(base64.b64decode(chunk[:usable]))
+            if carry:
+                f.write(base64.b64decode(carry))
+    except Exception:
+        target.unlink(missing_ok=True)
+        raise
+
+
+def _open_image(image_data: bytes, source_mime_type: str) -> "Image.Image":
+    """
+    Open image bytes with Pillow, trying the decoder implied by the MIME type first.
+
+    Restricting Image.open to a known format skips probing every registered
+    plugin. If the data does not match its declared type, all formats are tried.
+    """
+    # Pillow loads many plugin modules, so only import it when conversion is needed
+    from PIL import Image, UnidentifiedImageError
+
+    formats = _MIME_TO_PIL_FORMATS.get(source_mime_type)
+    if formats is not None:
+        try:
+            return Image.open(io.BytesIO(image_data), formats=formats)
+        except UnidentifiedImageError:
+            pass
+    return Image.open(io.BytesIO(image_data))
 
 
 def _convert_image_to_supported_format(
     image_data: bytes,
-    source_mime_type: str,  # noqa: ARG001
+    source_mime_type: str,
 ) -> tuple[str, str] | None:
     """
     Try to convert an unsupported image format to PNG.
 
+    Images that are already in a supported format are returned unchanged
+    with their detected MIME type.
+
     Args:
         image_data: The raw image bytes
-        source_mime_type: The original MIME type (currently unused but kept for API)
+        source_mime_type: The original MIME type, used to pick the decoder
 
     Returns:
         A tuple of (mime_type, base64_data) if conversion succeeds, None otherwise
     """
+    # Data already in a supported format only needs its MIME type corrected
+    detected_mime = _detect_image_mime_type(image_data[:12])
+    if detected_mime is not None:
+        return detected_mime, base64.b64encode(image_data).decode("utf-8")
+
     try:
         # Open the image with Pillow
-        img = Image.open(io.BytesIO(image_data))
+        img = _open_image(image_data, source_mime_type)
 
         # Convert to RGB if necessary (some formats like RGBA need this for JPEG)
         # PNG supports transparency, so we'll use PNG as target format
@@ -79,7 +312,8 @@ def _convert_image_to_supported_format(
 
         # Convert the image to the target format
         output_buffer = io.BytesIO()
-        img.save(output_buffer, format=output_format)
+        # Favour encoding speed over size; the result is only sent to the LLM
+        img.save(output_buffer, format=output_format, compress_level=1)
         output_buffer.seek(0)
 
         # Encode to base64
@@ -106,25 +340,26 @@ def _materialize_embedded_resource(
 
     if isinstance(res, ACPTextResourceContents):
         return TextContent(
-            text=(
-                "\n[BEGIN USER PROVIDED ADDITIONAL CONTEXT]\n"
-                f"URI: {res.uri}\n"
-                f"mimeType: {res.mimeType}\n"
-                "Content:\n"
-                f"{res.text}\n"
-                "[END USER PROVIDED ADDITIONAL CONTEXT]\n"
+            text=_TEXT_RESOURCE_TEMPLATE.format_map(
+                {"uri": res.uri, "mime_type": res.mimeType, "text": res.text}
             )
         )
 
     elif isinstance(res, ACPBlobResourceContents):
         mime_type = res.mimeType or ""
+        mime_type = _IMAGE_MIME_ALIASES.get(mime_type, mime_type)
 
-        # 1. If it's a supported image type, directly return ImageContent
-        if mime_type in SUPPORTED_IMAGE_MIME_TYPES:
-            data_uri = f"data:{mime_type};base64,{res.blob}"
-            return ImageContent(image_urls=[data_uri])
+        # 1. If it's a supported image type, directly return ImageContent.
+        # The header is sniffed so mislabelled images in a supported format
+        # are passed through as-is instead of being re-encoded.
+        if mime_type.startswith("image/"):
+            image_mime = _sniff_base64_image_mime_type(res.blob) or mime_type
+            if image_mime in SUPPORTED_IMAGE_MIME_TYPES:
+                data_uri = f"data:{image_mime};base64,{res.blob}"
+                return ImageContent(image_urls=[data_uri])
 
         # 2. If it's an unsupported image type, try to convert it
+        data: bytes | None = None
         if mime_type.startswith("image/"):
             data = base64.b64decode(res.blob)
             converted = _convert_image_to_supported_format(data, mime_type)
@@ -138,22 +373,22 @@ def _materialize_embedded_resource(
             # Conversion failed, fall through to disk storage
 
         # 3. For non-images or failed conversions, save to disk
-        data = base64.b64decode(res.blob)
-
-        ext = ""
-        if mime_type:
-            ext = mimetypes.guess_extension(mime_type) or ""
+        ext = _guess_extension(mime_type) if mime_type else ""
 
-        filename = f"embedded_resource_{uuid4().hex}{ext}"
-        target = ACP_CACHE_DIR / filename
-        target.write_bytes(data)
+        filename = _unique_cache_filename("embedded_resource", ext)
+        target = _ensure_cache_dir() / filename
+        if data is not None:
+            # Reuse the bytes already decoded for the conversion attempt
+            target.write_bytes(data)
+        else:
+            _write_base64_to_file(res.blob, target)
 
         # Provide appropriate message based on content type
         if mime_type.startswith("image/"):
             description = (
                 f"User provided image with unsupported format ({mime_type}).\n"
                 "Attempted automatic conversion failed.\n"
-                f"Supported formats: {', '.join(sorted(SUPPORTED_IMAGE_MIME_TYPES))}\n"
+                f"Supported formats: {_SUPPORTED_IMAGE_MIME_TYPES_STR}\n"
             )
         else:
             description = "User provided binary context (non-image).\n"
@@ -173,14 +408,14 @@ def convert_resources_to_content(
 ) -> TextContent | ImageContent:
     if isinstance(resource, ACPResourceContentBlock):
         return TextContent(
-            text=(
-                "\n[BEGIN USER PROVIDED ADDITIONAL RESOURCE]\n"
-                f"Type: {resource.type}\n"
-                f"URI: {resource.uri}\n"
-                f"name: {resource.name}\n"
-                f"mimeType: {resource.mimeType}\n"
-                f"size: {resource.size}\n"
-                "[END USER PROVIDED ADDITIONAL RESOURCE]\n"
+            text=_RESOURCE_LINK_TEMPLATE.format_map(
+                {
+                    "type": resource.type,
+                    "uri": resource.uri,
+                    "name": resource.name,
+                    "mime_type": resource.mimeType,
+                    "size": resource.size,
+                }
             )
         )
     elif isinstance(resource, ACPEmbeddedResourceContentBlock):
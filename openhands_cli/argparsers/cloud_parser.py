@@ -4,11 +4,20 @@ import argparse
 import os
 
 
-def add_cloud_parser(subparsers: argparse._SubParsersAction) -> argparse.ArgumentParser:
+def get_default_cloud_url() -> str:
+    """Return the cloud server URL to use when --server-url is not given."""
+    return os.getenv("OPENHANDS_CLOUD_URL", "https://app.all-hands.dev")
+
+
+def add_cloud_parser(
+    subparsers: argparse._SubParsersAction, default_cloud_url: str | None = None
+) -> argparse.ArgumentParser:
     """Add cloud subcommand parser.
 
     Args:
         subparsers: The subparsers object to add the cloud parser to
+        default_cloud_url: Default for --server-url, read from the environment
+            when not given
 
     Returns:
         The cloud argument parser
@@ -33,7 +42,8 @@ def add_cloud_parser(subparsers: argparse._SubParsersAction) -> argparse.Argumen
     )
 
     # Server URL argument
-    default_cloud_url = os.getenv("OPENHANDS_CLOUD_URL", "https://app.all-hands.dev")
+    if default_cloud_url is None:
+        default_cloud_url = get_default_cloud_url()
     cloud_parser.add_argument(
         "--server-url",
         type=str,
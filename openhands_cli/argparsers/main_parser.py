@@ -1,27 +1,26 @@
 """Main argument parser for OpenHands CLI."""
 
 import argparse
+import functools
+import sys
 
 from openhands_cli import __version__
 from openhands_cli.argparsers.acp_parser import add_acp_parser
 from openhands_cli.argparsers.auth_parser import add_login_parser, add_logout_parser
-from openhands_cli.argparsers.cloud_parser import add_cloud_parser
+from openhands_cli.argparsers.cloud_parser import (
+    add_cloud_parser,
+    get_default_cloud_url,
+)
 from openhands_cli.argparsers.mcp_parser import add_mcp_parser
 from openhands_cli.argparsers.serve_parser import add_serve_parser
 from openhands_cli.argparsers.utils import add_confirmation_mode_args
 from openhands_cli.argparsers.web_parser import add_web_parser
 
 
-def create_main_parser() -> argparse.ArgumentParser:
-    """Create the main argument parser with CLI as default and serve as subcommand.
+_VERSION_TEXT = f"OpenHands CLI {__version__}"
+_VERSION_FLAGS = frozenset({"--version", "-v"})
 
-    Returns:
-        The configured argument parser
-    """
-    parser = argparse.ArgumentParser(
-        description="OpenHands CLI - Terminal User Interface for OpenHands AI Agent",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
+_EPILOG = """
             By default, OpenHands runs in textual UI mode (terminal interface)
             with 'always-ask' confirmation mode, where all agent actions
             require user confirmation.
@@ -45,7 +44,31 @@ def create_main_parser() -> argparse.ArgumentParser:
                                                       server (e.g., Toad CLI, Zed IDE)
                 openhands login                     # Authenticate with OpenHands Cloud
                 openhands logout                    # Log out from OpenHands Cloud
-        """,
+"""
+
+
+def create_main_parser() -> argparse.ArgumentParser:
+    """Create the main argument parser with CLI as default and serve as subcommand.
+
+    The parser is built once and the same instance is returned on every call.
+    Callers may use it to parse arguments and format help, but must not add
+    arguments or otherwise mutate it.
+
+    Returns:
+        The configured argument parser
+    """
+    # Defaults taken from the environment are part of the cache key so the
+    # shared parser is rebuilt when they change
+    return _build_main_parser(get_default_cloud_url())
+
+
+@functools.lru_cache(maxsize=1)
+def _build_main_parser(default_cloud_url: str) -> argparse.ArgumentParser:
+    """Build the main argument parser; see create_main_parser."""
+    parser = argparse.ArgumentParser(
+        description="OpenHands CLI - Terminal User Interface for OpenHands AI Agent",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=_EPILOG,
     )
 
     # Version argument
@@ -53,7 +76,7 @@ def create_main_parser() -> argparse.ArgumentParser:
         "--version",
         "-v",
         action="version",
-        version=f"OpenHands CLI {__version__}",
+        version=_VERSION_TEXT,
         help="Show the version number and exit",
     )
 
@@ -133,10 +156,32 @@ def create_main_parser() -> argparse.ArgumentParser:
     add_mcp_parser(subparsers)
 
     # Add cloud subcommand
-    add_cloud_parser(subparsers)
+    add_cloud_parser(subparsers, default_cloud_url)
 
     # Add authentication subcommands
     add_login_parser(subparsers)
     add_logout_parser(subparsers)
 
     return parser
+
+
+def parse_main_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse the main CLI arguments.
+
+    A lone --version/-v flag is answered directly, without building the full
+    parser, since it is the most common invocation that exits immediately.
+
+    Args:
+        argv: Arguments to parse, defaulting to sys.argv[1:]
+
+    Returns:
+        The parsed arguments
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if len(argv) == 1 and argv[0] in _VERSION_FLAGS:
+        print(_VERSION_TEXT)
+        sys.exit(0)
+
+    return create_main_parser().parse_args(argv)
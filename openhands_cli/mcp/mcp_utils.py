@@ -4,13 +4,24 @@ This module provides functionality to manage MCP server configurations
 similar to Claude's MCP command line interface.
 """
 
+import functools
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Literal, cast
+from typing import Any, Literal, NotRequired, TypedDict, cast
 
 from fastmcp.exceptions import ValidationError
 from fastmcp.mcp_config import MCPConfig, RemoteMCPServer, StdioMCPServer
 from pydantic import ValidationError as PydanticValidationError
 
+import openhands_cli.locations as locations
+
+
+@functools.lru_cache(maxsize=8)
+def _build_mcp_config_path(persistence_dir: str, config_file: str) -> Path:
+    """Build the MCP configuration file path, reusing it for repeated lookups."""
+    return Path(persistence_dir) / config_file
+
 
 def _get_mcp_config_path() -> Path:
     """Get the MCP configuration file path.
@@ -18,10 +29,9 @@ def _get_mcp_config_path() -> Path:
     This function dynamically resolves the path to ensure it works
     correctly when PERSISTENCE_DIR is patched in tests.
     """
-    # Import the module and get the current value to support patching
-    import openhands_cli.locations as locations
-
-    return Path(locations.PERSISTENCE_DIR) / locations.MCP_CONFIG_FILE
+    # Read the module attributes on each call to support patching; the cache is
+    # keyed on their values, so a patched PERSISTENCE_DIR yields a new path
+    return _build_mcp_config_path(locations.PERSISTENCE_DIR, locations.MCP_CONFIG_FILE)
 
 
 class MCPConfigurationError(Exception):
@@ -30,6 +40,19 @@ class MCPConfigurationError(Exception):
     pass
 
 
+class MCPServerSpec(TypedDict):
+    """Server spec accepted by add_servers, mirroring add_server's arguments."""
+
+    name: str
+    transport: str
+    target: str
+    args: NotRequired[list[str] | None]
+    headers: NotRequired[list[str] | None]
+    env_vars: NotRequired[list[str] | None]
+    auth: NotRequired[str | None]
+    enabled: NotRequired[bool]
+
+
 def _ensure_config_dir(config_path: Path) -> None:
     """Ensure the configuration directory exists.
 
@@ -39,23 +62,50 @@ def _ensure_config_dir(config_path: Path) -> None:
     config_path.parent.mkdir(parents=True, exist_ok=True)
 
 
-def load_mcp_config() -> MCPConfig:
-    """Load the MCP configuration from file.
+def _read_config_file(config_path: Path) -> str | None:
+    """Read the raw configuration file contents.
+
+    Args:
+        config_path: Path to the configuration file
 
     Returns:
-        The MCPConfig object, or empty config if file doesn't exist.
+        The file contents, or None if the file doesn't exist.
+    """
+    if not config_path.exists():
+        return None
+    return config_path.read_text()
+
+
+def _write_config_file(config_path: Path, content: str) -> None:
+    """Write raw contents to the configuration file.
+
+    Args:
+        config_path: Path to the configuration file
+        content: Serialized configuration to write
+    """
+    _ensure_config_dir(config_path)
+    config_path.write_text(content)
+
+
+def _read_mcp_config(config_path: Path) -> MCPConfig | None:
+    """Read and validate the configuration file in a single pass.
+
+    Args:
+        config_path: Path to the configuration file
+
+    Returns:
+        The parsed MCPConfig object, or None if the file doesn't exist.
 
     Raises:
         MCPConfigurationError: If the configuration file is invalid.
-        ValidationError: If the configuration format is invalid.
     """
-    config_path = _get_mcp_config_path()
-    if not config_path.exists():
-        # Return empty config with mcpServers structure
-        return MCPConfig.from_dict({"mcpServers": {}})
-
     try:
-        return MCPConfig.from_file(config_path)
+        content = _read_config_file(config_path)
+        if content is None:
+            return None
+        if not content.strip():
+            raise ValueError(f"No MCP servers defined in the config: {config_path}")
+        return MCPConfig.model_validate_json(content)
     except (ValueError, PydanticValidationError) as e:
         # Re-raise as MCPConfigurationError for consistency
         raise MCPConfigurationError(f"Invalid MCP configuration file: {e}") from e
@@ -63,6 +113,23 @@ def load_mcp_config() -> MCPConfig:
         raise MCPConfigurationError(f"Error reading config file: {e}") from e
 
 
+def load_mcp_config() -> MCPConfig:
+    """Load the MCP configuration from file.
+
+    Returns:
+        The MCPConfig object, or empty config if file doesn't exist.
+
+    Raises:
+        MCPConfigurationError: If the configuration file is invalid.
+        ValidationError: If the configuration format is invalid.
+    """
+    config = _read_mcp_config(_get_mcp_config_path())
+    if config is None:
+        # Return empty config with mcpServers structure
+        return MCPConfig.from_dict({"mcpServers": {}})
+    return config
+
+
 def save_mcp_config(config: MCPConfig) -> None:
     """Save the MCP configuration to file.
 
@@ -74,8 +141,7 @@ def save_mcp_config(config: MCPConfig) -> None:
     """
     try:
         config_path = _get_mcp_config_path()
-        _ensure_config_dir(config_path)
-        config.write_to_file(config_path)
+        _write_config_file(config_path, config.model_dump_json(indent=2))
     except Exception as e:
         raise MCPConfigurationError(f"Error saving config file: {e}") from e
 
@@ -95,15 +161,15 @@ def _parse_headers(headers: list[str] | None) -> dict[str, str]:
     if not headers:
         return {}
 
-    parsed_headers = {}
-    for header in headers:
-        if ":" not in header:
+    def parse(header: str) -> tuple[str, str]:
+        key, sep, value = header.partition(":")
+        if not sep:
             raise MCPConfigurationError(
                 f"Invalid header format '{header}'. Expected 'key: value'"
             )
-        key, value = header.split(":", 1)
-        parsed_headers[key.strip()] = value.strip()
-    return parsed_headers
+        return key.strip(), value.strip()
+
+    return dict(parse(header) for header in headers)
 
 
 def _parse_env_vars(env_vars: list[str] | None) -> dict[str, str]:
@@ -121,19 +187,18 @@ def _parse_env_vars(env_vars: list[str] | None) -> dict[str, str]:
     if not env_vars:
         return {}
 
-    parsed_env = {}
-    for env_var in env_vars:
-        if "=" not in env_var:
+    def parse(env_var: str) -> tuple[str, str]:
+        key, sep, value = env_var.partition("=")
+        if not sep:
             raise MCPConfigurationError(
                 f"Invalid environment variable format '{env_var}'. Expected 'KEY=value'"
             )
-        key, value = env_var.split("=", 1)
-        parsed_env[key.strip()] = value.strip()
-    return parsed_env
+        return key.strip(), value.strip()
 
+    return dict(parse(env_var) for env_var in env_vars)
 
-def add_server(
-    name: str,
+
+def _create_server(
     transport: str,
     target: str,
     args: list[str] | None = None,
@@ -141,29 +206,12 @@ def add_server(
     env_vars: list[str] | None = None,
     auth: str | None = None,
     enabled: bool = True,
-) -> None:
-    """Add a new MCP server configuration.
-
-    Args:
-        name: Name of the MCP server
-        transport: Transport type (http, sse, stdio)
-        target: URL for http/sse or command for stdio
-        args: Additional arguments for stdio transport
-        headers: HTTP headers for http/sse transports
-        env_vars: Environment variables for stdio transport
-        auth: Authentication method (e.g., "oauth")
-        enabled: Whether the server is enabled (defaults to True)
+) -> StdioMCPServer | RemoteMCPServer:
+    """Create a server object for the given transport type.
 
     Raises:
-        MCPConfigurationError: If configuration is invalid or server already exists
+        MCPConfigurationError: If the transport or any option is invalid
     """
-    config = load_mcp_config()
-
-    # Check if server already exists
-    if name in config.mcpServers:
-        raise MCPConfigurationError(f"MCP server '{name}' already exists")
-
-    # Create the appropriate server object based on transport type
     if transport == "stdio":
         server = StdioMCPServer(
             command=target,
@@ -184,9 +232,101 @@ def add_server(
     # Add the enabled field to the server
     # These models have extra='allow', so we can set additional fields
     setattr(server, "enabled", enabled)
+    return server
+
+
+def add_server(
+    name: str,
+    transport: str,
+    target: str,
+    args: list[str] | None = None,
+    headers: list[str] | None = None,
+    env_vars: list[str] | None = None,
+    auth: str | None = None,
+    enabled: bool = True,
+) -> None:
+    """Add a new MCP server configuration.
+
+    Args:
+        name: Name of the MCP server
+        transport: Transport type (http, sse, stdio)
+        target: URL for http/sse or command for stdio
+        args: Additional arguments for stdio transport
+        headers: HTTP headers for http/sse transports
+        env_vars: Environment variables for stdio transport
+        auth: Authentication method (e.g., "oauth")
+        enabled: Whether the server is enabled (defaults to True)
+
+    Raises:
+        MCPConfigurationError: If configuration is invalid or server already exists
+    """
+    add_servers(
+        [
+            {
+                "name": name,
+                "transport": transport,
+                "target": target,
+                "args": args,
+                "headers": headers,
+                "env_vars": env_vars,
+                "auth": auth,
+                "enabled": enabled,
+            }
+        ]
+    )
+
+
+def _check_server_spec(spec: MCPServerSpec) -> None:
+    """Check that a server spec has every required key and no unknown ones.
+
+    Raises:
+        MCPConfigurationError: If a key is missing or unknown
+    """
+    missing = MCPServerSpec.__required_keys__ - spec.keys()
+    if missing:
+        raise MCPConfigurationError(
+            f"MCP server spec is missing required keys: {', '.join(sorted(missing))}"
+        )
+
+    unknown = spec.keys() - MCPServerSpec.__annotations__.keys()
+    if unknown:
+        raise MCPConfigurationError(
+            f"MCP server spec has unknown keys: {', '.join(sorted(unknown))}"
+        )
+
+
+def add_servers(specs: Iterable[MCPServerSpec]) -> None:
+    """Add several MCP server configurations with a single config write.
+
+    Args:
+        specs: Server specs, each holding the keyword arguments of add_server
+
+    Raises:
+        MCPConfigurationError: If any spec is invalid or names an existing
+            server; nothing is saved in that case
+    """
+    config = load_mcp_config()
+
+    for spec in specs:
+        _check_server_spec(spec)
+        name = spec["name"]
+
+        # Check if server already exists
+        if name in config.mcpServers:
+            raise MCPConfigurationError(f"MCP server '{name}' already exists")
+
+        # Add the server to the configuration
+        server = _create_server(
+            spec["transport"],
+            spec["target"],
+            args=spec.get("args"),
+            headers=spec.get("headers"),
+            env_vars=spec.get("env_vars"),
+            auth=spec.get("auth"),
+            enabled=spec.get("enabled", True),
+        )
+        config.add_server(name, server)
 
-    # Add the server to the configuration
-    config.add_server(name, server)
     save_mcp_config(config)
 
     # Validate the saved configuration by loading it (ensures compatibility)
@@ -248,76 +388,79 @@ def get_server(name: str) -> StdioMCPServer | RemoteMCPServer:
     return servers[name]
 
 
-def enable_server(name: str) -> None:
-    """Enable an MCP server configuration.
+@contextmanager
+def mcp_config_transaction() -> Iterator[MCPConfig]:
+    """Load the MCP configuration for several changes and save it once.
 
-    Args:
-        name: Name of the MCP server to enable
+    Yields:
+        The loaded MCPConfig, to be mutated in place (e.g. by passing it to
+        set_server_enabled)
 
     Raises:
-        MCPConfigurationError: If server doesn't exist
+        MCPConfigurationError: If the configuration cannot be loaded or saved.
+            Nothing is saved if the block raises.
     """
     config = load_mcp_config()
-
-    # Check if server exists
-    if name not in config.mcpServers:
-        raise MCPConfigurationError(f"MCP server '{name}' not found")
-
-    # Get the server and update the enabled field
-    server = config.mcpServers[name]
-    server_dict = server.model_dump()
-    server_dict["enabled"] = True
-
-    # Recreate the server with the updated enabled field
-    if isinstance(server, StdioMCPServer):
-        updated_server = StdioMCPServer(**server_dict)
-    elif isinstance(server, RemoteMCPServer):
-        updated_server = RemoteMCPServer(**server_dict)
-    else:
-        raise MCPConfigurationError(f"Unknown server type for '{name}'")
-
-    # Update the config
-    config.mcpServers[name] = updated_server
+    yield config
     save_mcp_config(config)
 
     # Validate the saved configuration by loading it
     load_mcp_config()
 
 
-def disable_server(name: str) -> None:
-    """Disable an MCP server configuration.
+def set_server_enabled(
+    name: str, enabled: bool, config: MCPConfig | None = None
+) -> None:
+    """Enable or disable an MCP server configuration.
 
     Args:
-        name: Name of the MCP server to disable
+        name: Name of the MCP server
+        enabled: Whether the server should be enabled
+        config: Configuration from mcp_config_transaction to update in place;
+            when omitted, the configuration file is loaded and saved
 
     Raises:
         MCPConfigurationError: If server doesn't exist
     """
-    config = load_mcp_config()
+    if config is None:
+        with mcp_config_transaction() as config:
+            set_server_enabled(name, enabled, config)
+        return
 
     # Check if server exists
     if name not in config.mcpServers:
         raise MCPConfigurationError(f"MCP server '{name}' not found")
 
-    # Get the server and update the enabled field
-    server = config.mcpServers[name]
-    server_dict = server.model_dump()
-    server_dict["enabled"] = False
+    # These models have extra='allow', so the enabled field can be set directly
+    setattr(config.mcpServers[name], "enabled", enabled)
 
-    # Recreate the server with the updated enabled field
-    if isinstance(server, StdioMCPServer):
-        updated_server = StdioMCPServer(**server_dict)
-    elif isinstance(server, RemoteMCPServer):
-        updated_server = RemoteMCPServer(**server_dict)
-    else:
-        raise MCPConfigurationError(f"Unknown server type for '{name}'")
 
-    # Update the config
-    config.mcpServers[name] = updated_server
-    save_mcp_config(config)
+def enable_server(name: str, config: MCPConfig | None = None) -> None:
+    """Enable an MCP server configuration.
 
-    # Validate the saved configuration by loading it
-    load_mcp_config()
+    Args:
+        name: Name of the MCP server to enable
+        config: Configuration from mcp_config_transaction to update in place;
+            when omitted, the configuration file is loaded and saved
+
+    Raises:
+        MCPConfigurationError: If server doesn't exist
+    """
+    set_server_enabled(name, True, config)
+
+
+def disable_server(name: str, config: MCPConfig | None = None) -> None:
+    """Disable an MCP server configuration.
+
+    Args:
+        name: Name of the MCP server to disable
+        config: Configuration from mcp_config_transaction to update in place;
+            when omitted, the configuration file is loaded and saved
+
+    Raises:
+        MCPConfigurationError: If server doesn't exist
+    """
+    set_server_enabled(name, False, config)
 
 
 def server_exists(name: str) -> bool:
@@ -347,9 +490,8 @@ def is_server_enabled(name: str) -> bool:
     """
     try:
         server = get_server(name)
-        server_dict = server.model_dump()
         # Default to True if enabled field is not present
-        return server_dict.get("enabled", True)
+        return getattr(server, "enabled", True)
     except (MCPConfigurationError, ValidationError):
         return False
 
@@ -364,9 +506,8 @@ def list_enabled_servers() -> dict[str, StdioMCPServer | RemoteMCPServer]:
     enabled_servers = {}
 
     for name, server in config.mcpServers.items():
-        server_dict = server.model_dump()
         # Default to True if enabled field is not present (backwards compatibility)
-        if server_dict.get("enabled", True):
+        if getattr(server, "enabled", True):
             enabled_servers[name] = server
 
     return enabled_servers
@@ -385,27 +526,28 @@ def get_config_status() -> dict[str, Any]:
         }
     """
     config_path = _get_mcp_config_path()
-    if not config_path.exists():
+    try:
+        config = _read_mcp_config(config_path)
+    except (MCPConfigurationError, ValidationError) as e:
         return {
-            "exists": False,
+            "exists": True,
             "valid": False,
             "servers": {},
-            "message": f"MCP configuration file not found at {config_path}",
+            "message": f"Invalid MCP configuration file: {str(e)}",
         }
 
-    try:
-        config = load_mcp_config()
-        servers = config.to_dict().get("mcpServers", {})
-        return {
-            "exists": True,
-            "valid": True,
-            "servers": servers,
-            "message": f"Valid MCP configuration found with {len(servers)} server(s)",
-        }
-    except (MCPConfigurationError, ValidationError) as e:
+    if config is None:
         return {
-            "exists": True,
+            "exists": False,
             "valid": False,
             "servers": {},
-            "message": f"Invalid MCP configuration file: {str(e)}",
+            "message": f"MCP configuration file not found at {config_path}",
         }
+
+    servers = config.to_dict().get("mcpServers", {})
+    return {
+        "exists": True,
+        "valid": True,
+        "servers": servers,
+        "message": f"Valid MCP configuration found with {len(servers)} server(s)",
+    }
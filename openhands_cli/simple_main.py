@@ -13,7 +13,7 @@ from pathlib import Path
 from dotenv import load_dotenv
 from rich.console import Console
 
-from openhands_cli.argparsers.main_parser import create_main_parser
+from openhands_cli.argparsers.main_parser import create_main_parser, parse_main_args
 from openhands_cli.theme import OPENHANDS_THEME
 from openhands_cli.utils import create_seeded_instructions_from_args
 
@@ -86,8 +86,8 @@ def main() -> None:
         ImportError: If agent chat dependencies are missing
         Exception: On other error conditions
     """
+    args = parse_main_args()
     parser = create_main_parser()
-    args = parser.parse_args()
 
     # Handle --json flag (only works with --headless)
     json_mode = args.json and args.headless
@@ -2,7 +2,10 @@
 
 import base64
 import io
+import re
+from pathlib import Path
 
+import pytest
 from acp.schema import (
     BlobResourceContents,
     EmbeddedResourceContentBlock,
@@ -14,9 +17,22 @@ from acp.schema import (
 from PIL import Image
 
 from openhands.sdk import ImageContent, TextContent
+from openhands_cli.acp_impl.utils import resources
 from openhands_cli.acp_impl.utils.convert import convert_acp_prompt_to_message_content
 
 
+_SAVED_FILE_RE = re.compile(r"Saved to file: (.+)\n")
+
+
+@pytest.fixture
+def acp_cache_dir(tmp_path, monkeypatch):
+    """Point the ACP cache at a directory that does not exist yet."""
+    cache_dir = tmp_path / "cache" / "acp"
+    monkeypatch.setattr(resources, "ACP_CACHE_DIR", cache_dir)
+    monkeypatch.setattr(resources, "_cache_dir_ready", False)
+    return cache_dir
+
+
 def test_convert_text_content():
     """Test converting ACP text content block to SDK format."""
     acp_prompt: list = [TextContentBlock(type="text", text="Hello, world!")]
@@ -141,6 +157,20 @@ def test_convert_image_with_different_mime_types():
         assert result[0].image_urls[0].startswith(f"data:{mime_type};base64,")
 
 
+def test_convert_aliased_image_mime_type():
+    """Test that non-canonical MIME aliases pass the original data through."""
+    test_data = base64.b64encode(b"fake_image_data").decode("utf-8")
+    acp_prompt: list = [
+        ImageContentBlock(type="image", data=test_data, mime_type="image/jpg")
+    ]
+
+    result = convert_acp_prompt_to_message_content(acp_prompt)
+
+    assert len(result) == 1
+    assert isinstance(result[0], ImageContent)
+    assert result[0].image_urls == [f"data:image/jpeg;base64,{test_data}"]
+
+
 def test_convert_unsupported_image_mime_type_with_conversion():
     """Test that unsupported image formats are automatically converted."""
     # Create a real BMP image
@@ -188,6 +218,30 @@ def test_convert_corrupted_image_falls_back():
     assert "Saved to file:" in result[0].text
 
 
+def test_convert_corrupted_image_is_saved_in_cache_dir(acp_cache_dir):
+    """Test that an unconvertible image is written under the ACP cache dir."""
+    raw_data = b"not_a_real_image"
+    acp_prompt: list = [
+        ImageContentBlock(
+            type="image",
+            data=base64.b64encode(raw_data).decode("utf-8"),
+            mime_type="image/bmp",
+        )
+    ]
+    # The cache dir is only created once something is saved
+    assert not acp_cache_dir.exists()
+
+    result = convert_acp_prompt_to_message_content(acp_prompt)
+
+    assert isinstance(result[0], TextContent)
+    match = _SAVED_FILE_RE.search(result[0].text)
+    assert match is not None
+    saved = Path(match.group(1))
+    assert saved.parent == resources._ensure_cache_dir() == acp_cache_dir
+    assert saved.name.startswith("image_")
+    assert saved.read_bytes() == raw_data
+
+
 def test_convert_resource_content_block():
     """Test converting ResourceContentBlock to TextContent."""
     acp_prompt: list = [
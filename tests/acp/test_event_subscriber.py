@@ -1,7 +1,10 @@
 """Tests for the EventSubscriber class."""
 
-from typing import ClassVar
-from unittest.mock import AsyncMock, MagicMock
+import asyncio
+import re
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, ClassVar
 
 import pytest
 from acp.schema import (
@@ -11,67 +14,138 @@ from acp.schema import (
     SessionUpdate5,
     SessionUpdate6,
 )
+from rich.text import Text
 
 from openhands.sdk import Message, TextContent
 from openhands.sdk.event import (
+    ActionEvent,
     AgentErrorEvent,
     Condensation,
     CondensationRequest,
     ConversationStateUpdateEvent,
+    Event,
     MessageEvent,
     ObservationEvent,
     PauseEvent,
     SystemPromptEvent,
+    UserRejectObservation,
 )
+from openhands.sdk.llm import MessageToolCall
 from openhands.tools.task_tracker.definition import (
     TaskItem,
     TaskTrackerObservation,
 )
+from openhands.tools.terminal.definition import TerminalAction, TerminalObservation
 from openhands_cli.acp_impl.event import EventSubscriber
 
 
-@pytest.fixture
+# The tests only await mocks, so they can all run on one module-wide event loop
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+# Messages are immutable inputs, so build (and validate) them once
+_ASSISTANT_MSG = Message(role="assistant", content=[TextContent(text="Test response")])
+_EMPTY_ASSISTANT_MSG = Message(role="assistant", content=[TextContent(text="")])
+_USER_MSG = Message(role="user", content=[TextContent(text="User message")])
+# The subscriber only reads visualize.plain, so one non-empty Text suffices
+_DUMMY_TEXT = Text("dummy")
+_TASK_LIST = (
+    TaskItem(title="Task 1", notes="Details for task 1", status="done"),
+    TaskItem(title="Task 2", notes="", status="in_progress"),
+    TaskItem(title="Task 3", notes="Details for task 3", status="todo"),
+)
+
+
+class ObservationEventSubclass(ObservationEvent):
+    """Observation event type without a handler of its own."""
+
+
+class UnroutedEvent(Event):
+    """Event type that EventSubscriber has no handler for."""
+
+
+class RecordingConnection:
+    """Minimal ACP connection that records session_update notifications.
+
+    Only session_update is used by EventSubscriber, so recording its keyword
+    arguments is cheaper than routing every call through AsyncMock.
+    """
+
+    def __init__(self) -> None:
+        self.calls: list[dict[str, Any]] = []
+
+    async def session_update(self, **kwargs: Any) -> None:
+        self.calls.append(kwargs)
+
+    @property
+    def called(self) -> bool:
+        return bool(self.calls)
+
+    @property
+    def call_count(self) -> int:
+        return len(self.calls)
+
+    def reset(self) -> None:
+        self.calls.clear()
+
+
+def _observation_event(observation: Any, tool_call_id: str) -> ObservationEvent:
+    """Build a real ObservationEvent wrapping the given observation."""
+    return ObservationEvent(
+        source="environment",
+        observation=observation,
+        action_id="action-1",
+        tool_name="terminal",
+        tool_call_id=tool_call_id,
+    )
+
+
+@pytest.fixture(scope="module")
 def mock_connection():
-    """Create a mock ACP connection."""
-    conn = AsyncMock()
-    return conn
+    """Create a recording ACP connection shared by the tests in this module."""
+    return RecordingConnection()
+
+
+@pytest.fixture(autouse=True)
+def _reset_mock_connection(mock_connection):
+    """Clear recorded calls on the shared connection after each test."""
+    yield
+    mock_connection.reset()
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def event_subscriber(mock_connection):
-    """Create an EventSubscriber instance."""
+    """Create an EventSubscriber instance.
+
+    EventSubscriber keeps no per-event state, so one instance can be shared.
+    """
     return EventSubscriber("test-session", mock_connection)
 
 
-@pytest.mark.asyncio
 async def test_handle_message_event(event_subscriber, mock_connection):
     """Test handling of MessageEvent from assistant."""
     # Create a mock MessageEvent
-    message = Message(role="assistant", content=[TextContent(text="Test response")])
-    event = MessageEvent(source="agent", llm_message=message)
+    event = MessageEvent(source="agent", llm_message=_ASSISTANT_MSG)
 
     # Process the event
     await event_subscriber(event)
 
     # Verify session_update was called
-    assert mock_connection.session_update.called
+    assert mock_connection.called
     # Get the update parameter (second argument, first is session_id)
-    call_kwargs = mock_connection.session_update.call_args[1]
+    call_kwargs = mock_connection.calls[-1]
     assert call_kwargs["session_id"] == "test-session"
     assert isinstance(call_kwargs["update"], SessionUpdate2)
     assert call_kwargs["update"].session_update == "agent_message_chunk"
 
 
-@pytest.mark.asyncio
 async def test_handle_action_event(event_subscriber, mock_connection):
     """Test handling of ActionEvent."""
-    # Create a mock ActionEvent with proper structure
-    from rich.text import Text
 
+    # Create a mock ActionEvent with proper structure
     # Create a simple object for the action with only needed attributes
     class MockAction:
         title = "Test Action"
-        visualize = Text("Executing test action")
+        visualize = _DUMMY_TEXT
 
         def model_dump(self):
             return {"title": self.title}
@@ -93,7 +167,7 @@ async def test_handle_action_event(event_subscriber, mock_connection):
         tool_call_id = "test-call-123"
         action = MockAction()
         tool_call = MockToolCall()
-        visualize = Text("Executing test action")
+        visualize = _DUMMY_TEXT
 
     event = MockEvent()
 
@@ -102,13 +176,12 @@ async def test_handle_action_event(event_subscriber, mock_connection):
 
     # Verify session_update was called multiple times (reasoning, thought, tool_call)
     # Should be at least 2: thought + tool_call
-    assert mock_connection.session_update.call_count >= 2
+    assert mock_connection.call_count >= 2
 
     # Check that tool_call notification was sent
-    calls = mock_connection.session_update.call_args_list
+    calls = mock_connection.calls
     tool_call_found = False
-    for call in calls:
-        call_kwargs = call[1]
+    for call_kwargs in calls:
         update = call_kwargs["update"]
         if isinstance(update, SessionUpdate4):
             tool_call_found = True
@@ -120,29 +193,20 @@ async def test_handle_action_event(event_subscriber, mock_connection):
     assert tool_call_found, "tool_call notification should be sent"
 
 
-@pytest.mark.asyncio
 async def test_handle_observation_event(event_subscriber, mock_connection):
     """Test handling of ObservationEvent."""
-    from rich.text import Text
-
-    # Create a mock observation
-    mock_observation = MagicMock()
-    mock_observation.to_llm_content = [
-        TextContent(text="Command executed successfully")
-    ]
-
     # Create ObservationEvent
-    event = MagicMock(spec=ObservationEvent)
-    event.visualize = Text("Result: success")
-    event.tool_call_id = "test-call-123"
-    event.observation = mock_observation
+    observation = TerminalObservation.from_text(
+        text="Command executed successfully", command="ls", exit_code=0
+    )
+    event = _observation_event(observation, "test-call-123")
 
     # Process the event
     await event_subscriber._handle_observation_event(event)
 
     # Verify session_update was called
-    assert mock_connection.session_update.called
-    call_kwargs = mock_connection.session_update.call_args[1]
+    assert mock_connection.called
+    call_kwargs = mock_connection.calls[-1]
     assert call_kwargs["session_id"] == "test-session"
     update = call_kwargs["update"]
     assert isinstance(update, SessionUpdate5)
@@ -151,24 +215,23 @@ async def test_handle_observation_event(event_subscriber, mock_connection):
     assert update.status == "completed"
 
 
-@pytest.mark.asyncio
 async def test_handle_agent_error_event(event_subscriber, mock_connection):
     """Test handling of AgentErrorEvent."""
-    from rich.text import Text
-
-    # Create AgentErrorEvent
-    event = MagicMock(spec=AgentErrorEvent)
-    event.visualize = Text("Error: Something went wrong")
-    event.tool_call_id = "test-call-123"
-    event.error = "Something went wrong"
-    event.model_dump = MagicMock(return_value={"error": "Something went wrong"})
+    # Create AgentErrorEvent stand-in: anything that is not an ObservationEvent
+    # takes the failed branch, so only the fields the subscriber reads are needed
+    event = SimpleNamespace(
+        visualize=_DUMMY_TEXT,
+        tool_call_id="test-call-123",
+        error="Something went wrong",
+        model_dump=lambda: {"error": "Something went wrong"},
+    )
 
     # Process the event
     await event_subscriber._handle_observation_event(event)
 
     # Verify session_update was called
-    assert mock_connection.session_update.called
-    call_kwargs = mock_connection.session_update.call_args[1]
+    assert mock_connection.called
+    call_kwargs = mock_connection.calls[-1]
     assert call_kwargs["session_id"] == "test-session"
     update = call_kwargs["update"]
     assert isinstance(update, SessionUpdate5)
@@ -177,26 +240,22 @@ async def test_handle_agent_error_event(event_subscriber, mock_connection):
     assert update.raw_output == {"error": "Something went wrong"}
 
 
-@pytest.mark.asyncio
 async def test_event_subscriber_with_empty_text(event_subscriber, mock_connection):
     """Test that events with empty text don't trigger updates."""
     # Create a MessageEvent with empty text
-    message = Message(role="assistant", content=[TextContent(text="")])
-    event = MessageEvent(source="agent", llm_message=message)
+    event = MessageEvent(source="agent", llm_message=_EMPTY_ASSISTANT_MSG)
 
     # Process the event
     await event_subscriber(event)
 
     # Verify session_update was not called for empty text
-    assert not mock_connection.session_update.called
+    assert not mock_connection.called
 
 
-@pytest.mark.asyncio
 async def test_event_subscriber_with_user_message(event_subscriber, mock_connection):
     """Test that user messages are NOT sent (to avoid duplication in Zed UI)."""
     # Create a MessageEvent from user (not agent)
-    message = Message(role="user", content=[TextContent(text="User message")])
-    event = MessageEvent(source="user", llm_message=message)
+    event = MessageEvent(source="user", llm_message=_USER_MSG)
 
     # Process the event
     await event_subscriber(event)
@@ -204,236 +263,283 @@ async def test_event_subscriber_with_user_message(event_subscriber, mock_connect
     # Verify session_update was NOT called (user messages are skipped)
     # NOTE: Zed UI renders user messages when they're sent, so we don't
     # want to duplicate them by sending them again as UserMessageChunk
-    assert not mock_connection.session_update.called
+    assert not mock_connection.called
+
+
+async def test_handle_thought_chunk_events(event_subscriber, mock_connection):
+    """Test events that are forwarded as agent thought chunks."""
+    events = [
+        SystemPromptEvent(
+            source="agent", system_prompt=TextContent(text="System prompt"), tools=[]
+        ),
+        PauseEvent(source="user"),
+        Condensation(
+            source="environment",
+            forgotten_event_ids=["event1", "event2"],
+            summary="Some events were forgotten",
+            llm_response_id="response-123",
+        ),
+        CondensationRequest(source="environment"),
+    ]
 
+    # Each event's visualization is distinct, so it identifies its update
+    expected_texts = {type(event).__name__: event.visualize.plain for event in events}
+    assert len(set(expected_texts.values())) == len(events)
 
-@pytest.mark.asyncio
-async def test_handle_system_prompt_event(event_subscriber, mock_connection):
-    """Test handling of SystemPromptEvent."""
-    # Create a SystemPromptEvent
-    event = SystemPromptEvent(
-        source="agent", system_prompt=TextContent(text="System prompt"), tools=[]
-    )
+    # Process the events concurrently; each one sends a single update
+    await asyncio.gather(*(event_subscriber(event) for event in events))
 
-    # Process the event
-    await event_subscriber(event)
+    sent_texts = Counter()
+    for call_kwargs in mock_connection.calls:
+        assert call_kwargs["session_id"] == "test-session"
+        update = call_kwargs["update"]
+        assert isinstance(update, SessionUpdate3)
+        assert update.session_update == "agent_thought_chunk"
+        sent_texts[update.content.text] += 1
 
-    # Verify session_update was called
-    assert mock_connection.session_update.called
-    call_kwargs = mock_connection.session_update.call_args[1]
-    assert call_kwargs["session_id"] == "test-session"
-    update = call_kwargs["update"]
-    assert isinstance(update, SessionUpdate3)
-    assert update.session_update == "agent_thought_chunk"
+    for event_name, text in expected_texts.items():
+        assert sent_texts[text] == 1, f"{event_name} should send exactly one update"
+    assert mock_connection.call_count == len(events)
 
 
-@pytest.mark.asyncio
-async def test_handle_pause_event(event_subscriber, mock_connection):
-    """Test handling of PauseEvent."""
-    # Create a PauseEvent
-    event = PauseEvent(source="user")
+async def test_conversation_state_update_event_is_skipped(
+    event_subscriber, mock_connection
+):
+    """Test that ConversationStateUpdateEvent is skipped."""
+    # Create a ConversationStateUpdateEvent
+    event = ConversationStateUpdateEvent(source="environment", key="test", value="test")
 
     # Process the event
     await event_subscriber(event)
 
-    # Verify session_update was called
-    assert mock_connection.session_update.called
-    call_kwargs = mock_connection.session_update.call_args[1]
-    assert call_kwargs["session_id"] == "test-session"
-    update = call_kwargs["update"]
-    assert isinstance(update, SessionUpdate3)
-    assert update.session_update == "agent_thought_chunk"
-
-
-@pytest.mark.asyncio
-async def test_handle_condensation_event(event_subscriber, mock_connection):
-    """Test handling of Condensation event."""
-    # Create a Condensation event
-    event = Condensation(
-        source="environment",
-        forgotten_event_ids=["event1", "event2"],
-        summary="Some events were forgotten",
-        llm_response_id="response-123",
+    # Verify session_update was NOT called
+    assert not mock_connection.called
+
+
+@pytest.fixture(scope="module")
+def terminal_action_event():
+    """Build a real terminal ActionEvent once per module."""
+    return ActionEvent(
+        source="agent",
+        thought=[TextContent(text="Listing files")],
+        action=TerminalAction(command="ls"),
+        tool_name="terminal",
+        tool_call_id="call-1",
+        tool_call=MessageToolCall(
+            id="call-1",
+            name="terminal",
+            arguments='{"command": "ls"}',
+            origin="completion",
+        ),
+        llm_response_id="response-1",
     )
 
-    # Process the event
-    await event_subscriber(event)
-
-    # Verify session_update was called
-    assert mock_connection.session_update.called
-    call_kwargs = mock_connection.session_update.call_args[1]
-    assert call_kwargs["session_id"] == "test-session"
-    update = call_kwargs["update"]
-    assert isinstance(update, SessionUpdate3)
-    assert update.session_update == "agent_thought_chunk"
 
+@pytest.fixture(scope="module")
+def routed_observation_events(terminal_action_event):
+    """Build one real event per observation handler route, keyed by test id."""
+    observation_fields = {
+        "source": "environment",
+        "action_id": terminal_action_event.id,
+        "tool_name": "terminal",
+        "tool_call_id": "call-1",
+    }
+    observation = TerminalObservation.from_text(
+        text="file.txt", command="ls", exit_code=0
+    )
+    return {
+        "observation": ObservationEvent(observation=observation, **observation_fields),
+        "observation_subclass": ObservationEventSubclass(
+            observation=observation, **observation_fields
+        ),
+        "agent_error": AgentErrorEvent(
+            tool_name="terminal", tool_call_id="call-1", error="Command failed"
+        ),
+        "user_reject": UserRejectObservation(
+            rejection_reason="Not allowed", **observation_fields
+        ),
+    }
+
+
+@pytest.mark.parametrize(
+    "event_key,expected_status",
+    [
+        ("observation", "completed"),
+        ("observation_subclass", "completed"),
+        ("agent_error", "failed"),
+        ("user_reject", "failed"),
+    ],
+)
+async def test_call_routes_observation_events(
+    event_subscriber,
+    mock_connection,
+    routed_observation_events,
+    event_key,
+    expected_status,
+):
+    """Test that observation events and their subclasses are routed by __call__."""
+    await event_subscriber(routed_observation_events[event_key])
 
-@pytest.mark.asyncio
-async def test_handle_condensation_request_event(event_subscriber, mock_connection):
-    """Test handling of CondensationRequest event."""
-    # Create a CondensationRequest event
-    event = CondensationRequest(source="environment")
-
-    # Process the event
-    await event_subscriber(event)
-
-    # Verify session_update was called
-    assert mock_connection.session_update.called
-    call_kwargs = mock_connection.session_update.call_args[1]
-    assert call_kwargs["session_id"] == "test-session"
-    update = call_kwargs["update"]
-    assert isinstance(update, SessionUpdate3)
-    assert update.session_update == "agent_thought_chunk"
+    assert mock_connection.call_count == 1
+    update = mock_connection.calls[0]["update"]
+    assert isinstance(update, SessionUpdate5)
+    assert update.tool_call_id == "call-1"
+    assert update.status == expected_status
 
 
-@pytest.mark.asyncio
-async def test_conversation_state_update_event_is_skipped(
-    event_subscriber, mock_connection
+async def test_call_routes_action_event(
+    event_subscriber, mock_connection, terminal_action_event
 ):
-    """Test that ConversationStateUpdateEvent is skipped."""
-    # Create a ConversationStateUpdateEvent
-    event = ConversationStateUpdateEvent(source="environment", key="test", value="test")
+    """Test that ActionEvent is routed by __call__ to a tool_call notification."""
+    await event_subscriber(terminal_action_event)
 
-    # Process the event
-    await event_subscriber(event)
+    tool_calls = [
+        call["update"]
+        for call in mock_connection.calls
+        if isinstance(call["update"], SessionUpdate4)
+    ]
+    assert len(tool_calls) == 1
+    assert tool_calls[0].tool_call_id == "call-1"
+    assert tool_calls[0].kind == "execute"
+    assert tool_calls[0].title == "ls"
 
-    # Verify session_update was NOT called
-    assert not mock_connection.session_update.called
 
+async def test_call_ignores_unknown_event(event_subscriber, mock_connection):
+    """Test that events without a registered handler are ignored."""
+    await event_subscriber(UnroutedEvent(source="environment"))
 
-@pytest.mark.asyncio
-async def test_handle_task_tracker_observation(event_subscriber, mock_connection):
-    """Test handling of TaskTrackerObservation with plan updates."""
-    # Create a TaskTrackerObservation with multiple tasks
-    task_list = [
-        TaskItem(title="Task 1", notes="Details for task 1", status="done"),
-        TaskItem(title="Task 2", notes="", status="in_progress"),
-        TaskItem(title="Task 3", notes="Details for task 3", status="todo"),
-    ]
+    assert not mock_connection.called
 
-    observation = TaskTrackerObservation.from_text(
+
+@pytest.fixture(scope="module")
+def task_observation():
+    """Build a TaskTrackerObservation with multiple tasks once per module."""
+    return TaskTrackerObservation.from_text(
         text="Task list updated",
         command="plan",
-        task_list=task_list,
+        task_list=list(_TASK_LIST),
+    )
+
+
+@pytest.fixture(scope="module")
+def empty_task_observation():
+    """Build a TaskTrackerObservation with an empty task list once per module."""
+    return TaskTrackerObservation.from_text(
+        text="No tasks",
+        command="view",
+        task_list=[],
     )
 
+
+async def test_handle_task_tracker_observation(
+    event_subscriber, mock_connection, task_observation
+):
+    """Test handling of TaskTrackerObservation with plan updates."""
     # Create an ObservationEvent wrapping the TaskTrackerObservation
-    event = MagicMock(spec=ObservationEvent)
-    event.observation = observation
-    event.tool_call_id = "task-call-123"
-    event.model_dump = MagicMock(return_value={"command": "plan"})
+    event = _observation_event(task_observation, "task-call-123")
 
     # Process the event
     await event_subscriber._handle_observation_event(event)
 
     # Verify session_update was called twice (plan + tool_call_update)
-    assert mock_connection.session_update.call_count == 2
+    assert mock_connection.call_count == 2
 
-    # Verify the plan update was sent
-    calls = mock_connection.session_update.call_args_list
-    plan_update_found = False
-    tool_call_update_found = False
+    # Index the recorded updates by their concrete type
+    updates = {type(call["update"]): call["update"] for call in mock_connection.calls}
 
-    for call in calls:
-        call_kwargs = call[1]
-        update = call_kwargs["update"]
-        if isinstance(update, SessionUpdate6):
-            plan_update_found = True
-            # Verify plan structure
-            assert update.session_update == "plan"
-            assert len(update.entries) == 3
-
-            # Verify first entry (done -> completed)
-            # Note: notes are intentionally omitted for conciseness
-            entry1 = update.entries[0]
-            assert entry1.content == "Task 1"
-            assert entry1.status == "completed"
-            assert entry1.priority == "medium"
-
-            # Verify second entry (in_progress -> in_progress)
-            entry2 = update.entries[1]
-            assert entry2.content == "Task 2"
-            assert entry2.status == "in_progress"
-            assert entry2.priority == "medium"
-
-            # Verify third entry (todo -> pending)
-            entry3 = update.entries[2]
-            assert entry3.content == "Task 3"
-            assert entry3.status == "pending"
-            assert entry3.priority == "medium"
-
-        elif isinstance(update, SessionUpdate5):
-            tool_call_update_found = True
-            assert update.session_update == "tool_call_update"
-            assert update.tool_call_id == "task-call-123"
-            assert update.status == "completed"
-
-    assert plan_update_found, "AgentPlanUpdate notification should be sent"
-    assert tool_call_update_found, "ToolCallProgress notification should be sent"
-
-
-@pytest.mark.asyncio
-async def test_handle_task_tracker_with_empty_list(event_subscriber, mock_connection):
+    # Verify the plan update was sent
+    plan = updates.get(SessionUpdate6)
+    assert plan is not None, "AgentPlanUpdate notification should be sent"
+    assert plan.session_update == "plan"
+    assert len(plan.entries) == 3
+
+    # Verify first entry (done -> completed)
+    # Note: notes are intentionally omitted for conciseness
+    entry1 = plan.entries[0]
+    assert entry1.content == "Task 1"
+    assert entry1.status == "completed"
+    assert entry1.priority == "medium"
+
+    # Verify second entry (in_progress -> in_progress)
+    entry2 = plan.entries[1]
+    assert entry2.content == "Task 2"
+    assert entry2.status == "in_progress"
+    assert entry2.priority == "medium"
+
+    # Verify third entry (todo -> pending)
+    entry3 = plan.entries[2]
+    assert entry3.content == "Task 3"
+    assert entry3.status == "pending"
+    assert entry3.priority == "medium"
+
+    # Verify the tool call update was sent
+    progress = updates.get(SessionUpdate5)
+    assert progress is not None, "ToolCallProgress notification should be sent"
+    assert progress.session_update == "tool_call_update"
+    assert progress.tool_call_id == "task-call-123"
+    assert progress.status == "completed"
+
+
+async def test_handle_task_tracker_with_empty_list(
+    event_subscriber, mock_connection, empty_task_observation
+):
     """Test handling of TaskTrackerObservation with empty task list."""
-    observation = TaskTrackerObservation.from_text(
-        text="No tasks",
-        command="view",
-        task_list=[],
-    )
-
-    event = MagicMock(spec=ObservationEvent)
-    event.observation = observation
-    event.tool_call_id = "task-call-456"
-    event.model_dump = MagicMock(return_value={"command": "view"})
+    event = _observation_event(empty_task_observation, "task-call-456")
 
     # Process the event
     await event_subscriber._handle_observation_event(event)
 
     # Verify session_update was called twice (plan with empty list + tool_call_update)
-    assert mock_connection.session_update.call_count == 2
+    assert mock_connection.call_count == 2
 
     # Verify empty plan was sent
-    calls = mock_connection.session_update.call_args_list
-    plan_found = False
-    for call in calls:
-        call_kwargs = call[1]
-        update = call_kwargs["update"]
-        if isinstance(update, SessionUpdate6):
-            plan_found = True
-            assert update.entries == []
-
-    assert plan_found, "AgentPlanUpdate with empty entries should be sent"
+    updates = {type(call["update"]): call["update"] for call in mock_connection.calls}
+    plan = updates.get(SessionUpdate6)
+    assert plan is not None, "AgentPlanUpdate with empty entries should be sent"
+    assert plan.entries == []
 
 
-@pytest.mark.asyncio
-async def test_get_metadata_with_status_line(mock_connection):
-    """Test that _get_metadata returns status_line along with raw metrics."""
-    from unittest.mock import Mock
-
-    # Create a mock conversation with stats
-    mock_conversation = Mock()
+# Input abbreviated to K, output below 1000 left as is, reasoning shown when > 0
+_STATUS_LINE_RE = re.compile(
+    r"↑ input 1\.23K • cache hit [\d.]+% • reasoning \d+ • ↓ output 567 • \$ 0\.0567"
+)
+# Millions abbreviated to M, 50% cache hit rate, no reasoning part
+_STATUS_LINE_ABBR_RE = re.compile(
+    r"↑ input 5\.23M • cache hit 50\.00% • ↓ output 1\.23M • \$ 12\.3456"
+)
 
-    # Create mock token usage
-    usage = Mock()
-    usage.prompt_tokens = 1234
-    usage.completion_tokens = 567
-    usage.cache_read_tokens = 123
-    usage.reasoning_tokens = 100
 
-    # Create mock metrics
-    metrics = Mock()
-    metrics.accumulated_cost = 0.0567
-    metrics.accumulated_token_usage = usage
+def _make_conversation(
+    prompt: int, completion: int, cache: int, reasoning: int, cost: float
+) -> Any:
+    """Build a minimal conversation whose stats report the given usage."""
+    usage = SimpleNamespace(
+        prompt_tokens=prompt,
+        completion_tokens=completion,
+        cache_read_tokens=cache,
+        reasoning_tokens=reasoning,
+    )
+    metrics = SimpleNamespace(accumulated_cost=cost, accumulated_token_usage=usage)
+    return SimpleNamespace(
+        conversation_stats=SimpleNamespace(get_combined_metrics=lambda: metrics)
+    )
 
-    # Set up the mock to return our metrics
-    mock_conversation.conversation_stats.get_combined_metrics.return_value = metrics
 
-    # Create EventSubscriber with conversation
-    event_subscriber = EventSubscriber(
-        "test-session", mock_connection, mock_conversation
-    )
+@pytest.mark.parametrize(
+    "prompt,completion,cache,reasoning,cost,status_line_re",
+    [
+        (1234, 567, 123, 100, 0.0567, _STATUS_LINE_RE),
+        (5_234_567, 1_234_567, 2_617_284, 0, 12.3456, _STATUS_LINE_ABBR_RE),
+    ],
+    ids=["status_line", "abbreviations"],
+)
+async def test_get_metadata_status_line(
+    mock_connection, prompt, completion, cache, reasoning, cost, status_line_re
+):
+    """Test that _get_metadata returns raw metrics and a formatted status_line."""
+    conversation = _make_conversation(prompt, completion, cache, reasoning, cost)
+    event_subscriber = EventSubscriber("test-session", mock_connection, conversation)
 
-    # Get metadata
     metadata = event_subscriber._get_metadata()
 
     # Verify metadata structure
@@ -442,60 +548,13 @@ async def test_get_metadata_with_status_line(mock_connection):
     metrics_dict = metadata["openhands.dev/metrics"]
 
     # Verify raw metrics
-    assert metrics_dict["input_tokens"] == 1234
-    assert metrics_dict["output_tokens"] == 567
-    assert metrics_dict["cache_read_tokens"] == 123
-    assert metrics_dict["reasoning_tokens"] == 100
-    assert metrics_dict["cost"] == 0.0567
+    assert metrics_dict["input_tokens"] == prompt
+    assert metrics_dict["output_tokens"] == completion
+    assert metrics_dict["cache_read_tokens"] == cache
+    assert metrics_dict["reasoning_tokens"] == reasoning
+    assert metrics_dict["cost"] == cost
 
     # Verify status_line is present and formatted correctly
-    assert "status_line" in metrics_dict
     status_line = metrics_dict["status_line"]
     assert isinstance(status_line, str)
-    # Should contain key components
-    assert "↑ input" in status_line
-    assert "↓ output" in status_line
-    assert "cache hit" in status_line
-    assert "reasoning" in status_line  # Since reasoning_tokens > 0
-    assert "$" in status_line
-    # Check abbreviated values
-    assert "1.23K" in status_line  # input_tokens abbreviated
-    assert "567" in status_line  # output_tokens not abbreviated (< 1000)
-
-
-@pytest.mark.asyncio
-async def test_format_status_line_abbreviations(mock_connection):
-    """Test that _format_status_line correctly abbreviates large numbers."""
-    from unittest.mock import Mock
-
-    # Create a mock conversation with large token counts
-    mock_conversation = Mock()
-
-    # Create token usage with large numbers
-    usage = Mock()
-    usage.prompt_tokens = 5_234_567  # Should be 5.23M
-    usage.completion_tokens = 1_234_567  # Should be 1.23M
-    usage.cache_read_tokens = 2_617_284  # cache hit rate: 50%
-    usage.reasoning_tokens = 0
-
-    metrics = Mock()
-    metrics.accumulated_cost = 12.3456
-    metrics.accumulated_token_usage = usage
-
-    mock_conversation.conversation_stats.get_combined_metrics.return_value = metrics
-
-    event_subscriber = EventSubscriber(
-        "test-session", mock_connection, mock_conversation
-    )
-
-    # Get status line
-    metadata = event_subscriber._get_metadata()
-    assert metadata is not None
-    status_line = metadata["openhands.dev/metrics"]["status_line"]
-    assert isinstance(status_line, str)
-
-    # Verify abbreviations
-    assert "5.23M" in status_line  # 5,234,567 abbreviated
-    assert "1.23M" in status_line  # 1,234,567 abbreviated
-    assert "50.00%" in status_line  # Cache hit rate
-    assert "12.3456" in status_line  # Cost
+    assert status_line_re.fullmatch(status_line), status_line
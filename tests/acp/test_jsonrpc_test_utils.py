@@ -0,0 +1,169 @@
+"""Tests for the JSON-RPC testing helpers in openhands_cli.acp_impl.test_utils."""
+
+import os
+import sys
+from typing import Any
+
+import pytest
+
+from openhands_cli.acp_impl.test_utils import (
+    JsonRpcSession,
+    UnbufferedJsonRpcReader,
+    send_jsonrpc_batch_and_wait,
+)
+
+
+@pytest.fixture
+def pipe():
+    """Yield the (read, write) file objects of an OS pipe."""
+    read_fd, write_fd = os.pipe()
+    with os.fdopen(read_fd, "rb", buffering=0) as r, os.fdopen(write_fd, "wb") as w:
+        yield r, w
+
+
+def test_reader_reads_messages_split_across_writes(pipe):
+    """Test that a message arriving in several chunks is reassembled."""
+    r, w = pipe
+    with UnbufferedJsonRpcReader(r) as reader:
+        w.write(b'{"id": 1, "res')
+        w.flush()
+        w.write(b'ult": null}\n\n{"id": 2}\n')
+        w.flush()
+
+        assert reader.read_message(timeout=1.0) == {"id": 1, "result": None}
+        assert reader.read_message(timeout=1.0) == {"id": 2}
+
+
+def test_reader_read_message_times_out(pipe):
+    """Test that read_message returns None when no complete line arrives."""
+    r, w = pipe
+    with UnbufferedJsonRpcReader(r) as reader:
+        w.write(b'{"id": 1')
+        w.flush()
+
+        assert reader.read_message(timeout=0.05) is None
+
+
+def test_reader_context_manager_closes_selector(pipe):
+    """Test that leaving the context releases the reader's selector."""
+    r, _ = pipe
+    with UnbufferedJsonRpcReader(r) as reader:
+        assert reader.selector.get_map() is not None
+
+    # A closed selector no longer holds its file descriptor map
+    assert reader.selector.get_map() is None
+
+
+# Minimal line-delimited JSON-RPC server. Requests are answered with their
+# method and the number of notifications seen so far, except:
+#   hold   - answered after the next request, so responses arrive out of order
+#   notify - preceded by a server notification
+#   silent - never answered
+#   exit   - stops the server without answering
+_ECHO_SERVER = """
+import json, sys
+
+held, notifications = [], 0
+
+def respond(msg):
+    result = {"method": msg["method"], "notifications": notifications}
+    print(json.dumps({"jsonrpc": "2.0", "id": msg["id"], "result": result}))
+
+for line in sys.stdin:
+    msg = json.loads(line)
+    method = msg["method"]
+    if "id" not in msg:
+        notifications += 1
+    elif method == "exit":
+        break
+    elif method == "hold":
+        held.append(msg)
+    elif method != "silent":
+        if method == "notify":
+            print(json.dumps({"jsonrpc": "2.0", "method": "session/update"}))
+        for pending in [msg, *held]:
+            respond(pending)
+        held.clear()
+    sys.stdout.flush()
+"""
+
+
+def _request(request_id: int, method: str) -> dict[str, Any]:
+    """Build a JSON-RPC request for the echo server."""
+    return {"jsonrpc": "2.0", "id": request_id, "method": method}
+
+
+@pytest.fixture
+def echo_session():
+    """Run the echo server for the duration of a test."""
+    with JsonRpcSession(sys.executable, ["-c", _ECHO_SERVER], verbose=False) as s:
+        yield s
+
+
+def _send_batch(
+    session: JsonRpcSession, messages: list[dict[str, Any]], timeout: float = 5.0
+) -> list[tuple[bool, Any, str]]:
+    """Send a batch through the session's process and return its results."""
+    assert session.proc is not None
+    results, _ = send_jsonrpc_batch_and_wait(
+        session.proc, messages, timeout=timeout, reader=session.reader
+    )
+    return results
+
+
+def test_batch_matches_out_of_order_responses(echo_session):
+    """Test that responses arriving out of order are matched to their requests."""
+    results = _send_batch(echo_session, [_request(1, "hold"), _request(2, "echo")])
+
+    assert [(ok, error) for ok, _, error in results] == [(True, ""), (True, "")]
+    assert [response["result"]["method"] for _, response, _ in results] == [
+        "hold",
+        "echo",
+    ]
+
+
+def test_batch_skips_interleaved_server_notifications(echo_session):
+    """Test that server notifications between responses are skipped."""
+    results = _send_batch(echo_session, [_request(1, "notify"), _request(2, "notify")])
+
+    assert [response["id"] for _, response, _ in results] == [1, 2]
+
+
+def test_batch_reports_timeout_for_unanswered_requests(echo_session):
+    """Test that unanswered requests time out without losing answered ones."""
+    results = _send_batch(
+        echo_session, [_request(1, "echo"), _request(2, "silent")], timeout=0.2
+    )
+
+    assert results[0][0] is True
+    assert results[1] == (False, None, "Response timeout")
+
+
+def test_batch_reports_early_process_exit(echo_session):
+    """Test that responses sent before the process exits are still collected."""
+    results = _send_batch(
+        echo_session, [_request(1, "echo"), _request(2, "exit"), _request(3, "echo")]
+    )
+
+    assert results[0][0] is True
+    assert results[1:] == [(False, None, "Process terminated unexpectedly")] * 2
+
+
+def test_batch_does_not_wait_for_client_notifications(echo_session):
+    """Test that id-less messages are sent as notifications, not requests."""
+    notification = {"jsonrpc": "2.0", "method": "session/cancel"}
+
+    results = _send_batch(echo_session, [notification, _request(1, "echo")])
+
+    assert results[0] == (True, None, "")
+    assert results[1][1]["result"]["notifications"] == 1
+
+
+def test_session_send_pipelines_requests_in_order(echo_session):
+    """Test that pipelined sends return responses in request order."""
+    messages = [_request(i, method) for i, method in enumerate(["hold", "echo"] * 2)]
+
+    success, responses = echo_session.send(messages, pipeline=2)
+
+    assert success
+    assert [response["id"] for response in responses] == [0, 1, 2, 3]
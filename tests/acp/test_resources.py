@@ -1,8 +1,10 @@
 """Tests for ACP resource conversion utilities."""
 
 import base64
+import binascii
 import io
 
+import pytest
 from acp.schema import (
     BlobResourceContents,
     EmbeddedResourceContentBlock,
@@ -11,12 +13,18 @@ from acp.schema import (
 from PIL import Image
 
 from openhands.sdk import ImageContent, TextContent
+from openhands_cli.acp_impl.utils import resources
 from openhands_cli.acp_impl.utils.resources import (
     _convert_image_to_supported_format,
     _materialize_embedded_resource,
+    _write_base64_to_file,
 )
 
 
+_BLOB_BYTES = bytes(range(256)) * 12
+_BLOB_BASE64 = base64.b64encode(_BLOB_BYTES).decode("utf-8")
+
+
 def test_materialize_text_resource():
     """Test converting text resource to TextContent."""
     text_resource = TextResourceContents(
@@ -89,6 +97,49 @@ def test_materialize_unsupported_image_blob_with_conversion():
     assert result.image_urls[0].startswith("data:image/png;base64,")
 
 
+def test_materialize_mislabelled_supported_image_blob_passes_through():
+    """Test that a supported image with the wrong MIME type is not re-encoded."""
+    img = Image.new("RGB", (10, 10), color="green")
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    png_data = base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+    blob_resource = BlobResourceContents(
+        uri="file:///example.bmp",
+        mime_type="image/bmp",
+        blob=png_data,
+    )
+    block = EmbeddedResourceContentBlock(
+        type="resource",
+        resource=blob_resource,
+    )
+
+    result = _materialize_embedded_resource(block)
+
+    # The original base64 payload is reused with the detected MIME type
+    assert isinstance(result, ImageContent)
+    assert result.image_urls == [f"data:image/png;base64,{png_data}"]
+
+
+def test_materialize_aliased_image_mime_type():
+    """Test that non-canonical MIME aliases are treated as supported types."""
+    test_data = base64.b64encode(b"fake_image_data").decode("utf-8")
+    blob_resource = BlobResourceContents(
+        uri="file:///example.jpg",
+        mime_type="image/jpg",
+        blob=test_data,
+    )
+    block = EmbeddedResourceContentBlock(
+        type="resource",
+        resource=blob_resource,
+    )
+
+    result = _materialize_embedded_resource(block)
+
+    assert isinstance(result, ImageContent)
+    assert result.image_urls == [f"data:image/jpeg;base64,{test_data}"]
+
+
 def test_materialize_corrupted_image_blob():
     """Test that corrupted image data falls back to disk storage."""
     # Use invalid image data that can't be converted
@@ -160,20 +211,35 @@ def test_convert_image_to_supported_format_bmp():
 
 def test_convert_image_to_supported_format_with_transparency():
     """Test converting image with transparency preserves alpha channel."""
-    # Create an image with transparency
+    # Create a TIFF image with transparency, which needs a real conversion
     img = Image.new("RGBA", (10, 10), color=(255, 0, 0, 128))
     buffer = io.BytesIO()
-    img.save(buffer, format="PNG")
-    buffer.seek(0)
-    # Pretend it's TIFF
-    png_data = buffer.read()
+    img.save(buffer, format="TIFF")
+    tiff_data = buffer.getvalue()
 
-    result = _convert_image_to_supported_format(png_data, "image/tiff")
+    result = _convert_image_to_supported_format(tiff_data, "image/tiff")
 
     assert result is not None
     mime_type, converted_data = result
     assert mime_type == "image/png"  # Should use PNG to preserve transparency
 
+    converted_img = Image.open(io.BytesIO(base64.b64decode(converted_data)))
+    assert converted_img.format == "PNG"
+    assert converted_img.mode == "RGBA"
+    assert converted_img.getpixel((0, 0)) == (255, 0, 0, 128)
+
+
+def test_convert_image_to_supported_format_passes_through_supported_data():
+    """Test that data already in a supported format is not re-encoded."""
+    img = Image.new("RGB", (10, 10), color="yellow")
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG")
+    jpeg_data = buffer.getvalue()
+
+    result = _convert_image_to_supported_format(jpeg_data, "image/bmp")
+
+    assert result == ("image/jpeg", base64.b64encode(jpeg_data).decode("utf-8"))
+
 
 def test_convert_image_to_supported_format_invalid_data():
     """Test that invalid image data returns None."""
@@ -182,3 +248,58 @@ def test_convert_image_to_supported_format_invalid_data():
     result = _convert_image_to_supported_format(invalid_data, "image/bmp")
 
     assert result is None
+
+
+@pytest.fixture
+def small_base64_chunks(monkeypatch):
+    """Decode blobs a few characters at a time so inputs span many chunks."""
+    monkeypatch.setattr(resources, "_BASE64_CHUNK_CHARS", 8)
+
+
+@pytest.mark.parametrize(
+    "blob,expected",
+    [
+        (_BLOB_BASE64, _BLOB_BYTES),
+        # Line-wrapped at 76 characters, as produced by MIME encoders
+        (base64.encodebytes(_BLOB_BYTES).decode("utf-8"), _BLOB_BYTES),
+        # Stray non-alphabet characters shift every later chunk boundary
+        ("!" + _BLOB_BASE64[:101] + "\x00" + _BLOB_BASE64[101:] + " -", _BLOB_BYTES),
+        # Padding that completes a quantum ends the data, even mid-blob
+        ("QQ==QUJD", b"A"),
+        ("QUI=" + _BLOB_BASE64, b"AB"),
+        # The "==" run is split across the 8-character chunk boundary
+        ("QUJDQUJDQUJDQQ!==" + _BLOB_BASE64, b"ABCABCABCA"),
+        # Padding that completes no quantum is ignored
+        ("=QUJD=" + _BLOB_BASE64, b"ABC" + _BLOB_BYTES),
+    ],
+    ids=[
+        "plain",
+        "line_wrapped",
+        "stray_characters",
+        "padding_mid_blob",
+        "padding_before_chunks",
+        "padding_across_chunks",
+        "stray_padding",
+    ],
+)
+def test_write_base64_to_file_matches_b64decode(
+    small_base64_chunks, tmp_path, blob, expected
+):
+    """Test that chunked decoding matches decoding the blob in one go."""
+    target = tmp_path / "blob.bin"
+
+    _write_base64_to_file(blob, target)
+
+    assert target.read_bytes() == base64.b64decode(blob) == expected
+
+
+def test_write_base64_to_file_removes_partial_file(small_base64_chunks, tmp_path):
+    """Test that invalid base64 raises and leaves no partially written file."""
+    target = tmp_path / "blob.bin"
+    # Valid leading chunks are written before the truncated tail is reached
+    blob = _BLOB_BASE64[:-1]
+
+    with pytest.raises(binascii.Error):
+        _write_base64_to_file(blob, target)
+
+    assert not target.exists()
@@ -1,8 +1,8 @@
 """Unit tests for MCP command handlers."""
 
 import argparse
+import json
 import tempfile
-from pathlib import Path
 from unittest.mock import patch
 
 import pytest
@@ -21,13 +21,11 @@ from openhands_cli.mcp.mcp_display_utils import mask_sensitive_value
 
 
 @pytest.fixture
-def temp_config_path():
+def temp_config_path(tmp_path, monkeypatch):
     """Fixture that provides a temporary config path and patches PERSISTENCE_DIR."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        config_path = Path(temp_dir) / "mcp.json"
-        # Patch PERSISTENCE_DIR so that _get_mcp_config_path() returns our temp path
-        with patch("openhands_cli.locations.PERSISTENCE_DIR", str(temp_dir)):
-            yield config_path
+    # Patch PERSISTENCE_DIR so that _get_mcp_config_path() returns our temp path
+    monkeypatch.setattr("openhands_cli.locations.PERSISTENCE_DIR", str(tmp_path))
+    return tmp_path / "mcp.json"
 
 
 class TestMCPCommands:
@@ -439,8 +437,12 @@ class TestMCPCommandsIntegration:
                 )
                 handle_mcp_add(add_args)
 
-                # Verify server was added
+                # Verify server was added and saved to the temp config file
                 assert server_exists("test_server")
+                assert (
+                    "test_server"
+                    in json.loads(temp_config_path.read_text())["mcpServers"]
+                )
 
                 # List servers
                 list_args = argparse.Namespace()
@@ -454,5 +456,6 @@ class TestMCPCommandsIntegration:
                 remove_args = argparse.Namespace(name="test_server")
                 handle_mcp_remove(remove_args)
 
-                # Verify server was removed
+                # Verify server was removed from the temp config file
                 assert not server_exists("test_server")
+                assert json.loads(temp_config_path.read_text())["mcpServers"] == {}
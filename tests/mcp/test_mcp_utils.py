@@ -1,18 +1,19 @@
 """Unit tests for MCP configuration management."""
 
 import json
-import tempfile
+import re
 from pathlib import Path
-from unittest.mock import patch
 
 import pytest
 from fastmcp.mcp_config import RemoteMCPServer, StdioMCPServer
 
 from openhands_cli.mcp.mcp_utils import (
     MCPConfigurationError,
+    _get_mcp_config_path,
     _parse_env_vars,
     _parse_headers,
     add_server,
+    add_servers,
     disable_server,
     enable_server,
     get_config_status,
@@ -21,171 +22,302 @@ from openhands_cli.mcp.mcp_utils import (
     list_enabled_servers,
     list_servers,
     load_mcp_config,
+    mcp_config_transaction,
     remove_server,
     server_exists,
+    set_server_enabled,
 )
 
 
+# Error message patterns for pytest.raises, compiled once per module
+_ALREADY_EXISTS = re.compile("already exists")
+_INVALID_TRANSPORT = re.compile("Invalid transport type")
+_NOT_FOUND = re.compile("not found")
+_INVALID_HEADER = re.compile("Invalid header format")
+_INVALID_ENV_VAR = re.compile("Invalid environment variable format")
+_MISSING_KEYS = re.compile("missing required keys: name, target")
+_UNKNOWN_KEYS = re.compile("unknown keys: command")
+
+
+# Raw config file contents and parser inputs shared by the tests
+_STDIO_CONFIG_JSON = json.dumps(
+    {"mcpServers": {"test_server": {"command": "test", "transport": "stdio"}}}
+)
+_MISSING_SERVERS_CONFIG_JSON = json.dumps({"other_key": "value"})
+_VALID_HEADERS = ("Authorization: Bearer token", "Content-Type: application/json")
+_VALID_ENV_VARS = ("VAR1=value1", "VAR2=value2")
+
+
+@pytest.fixture(scope="module")
+def temp_config_dir(tmp_path_factory):
+    """Fixture that creates one temporary config directory for this module."""
+    return tmp_path_factory.mktemp("mcp")
+
+
 @pytest.fixture
-def temp_config_path():
-    """Fixture that provides a temporary config path and patches PERSISTENCE_DIR."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        config_path = Path(temp_dir) / "mcp.json"
-        # Patch PERSISTENCE_DIR so that _get_mcp_config_path() returns our temp path
-        with patch("openhands_cli.locations.PERSISTENCE_DIR", str(temp_dir)):
-            yield config_path
+def temp_config_path(temp_config_dir, monkeypatch):
+    """Fixture that provides an empty config path and patches PERSISTENCE_DIR.
+
+    The directory is shared across the module, so only the config file is
+    removed between tests. The patch is reapplied per test because the autouse
+    agent config fixture points PERSISTENCE_DIR at a fresh directory each time.
+    """
+    config_path = temp_config_dir / "mcp.json"
+    config_path.unlink(missing_ok=True)
+    # Patch PERSISTENCE_DIR so that _get_mcp_config_path() returns our temp path
+    monkeypatch.setattr("openhands_cli.locations.PERSISTENCE_DIR", str(temp_config_dir))
+    return config_path
+
+
+@pytest.fixture
+def config_store(monkeypatch):
+    """Fixture that keeps the MCP config in memory instead of on disk.
+
+    Tests that need raw file contents on disk (e.g. invalid JSON) use
+    temp_config_path instead.
+    """
+    store: dict[Path, str] = {}
+    monkeypatch.setattr("openhands_cli.mcp.mcp_utils._read_config_file", store.get)
+    monkeypatch.setattr(
+        "openhands_cli.mcp.mcp_utils._write_config_file", store.__setitem__
+    )
+    return store
+
+
+@pytest.fixture(scope="module")
+def seeded_config_content():
+    """Fixture that serializes a config with one http and one stdio server once."""
+    store: dict[Path, str] = {}
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("openhands_cli.mcp.mcp_utils._read_config_file", store.get)
+        mp.setattr("openhands_cli.mcp.mcp_utils._write_config_file", store.__setitem__)
+        add_servers(
+            [
+                {"name": "test", "transport": "http", "target": "https://example.com"},
+                {
+                    "name": "stdio_server",
+                    "transport": "stdio",
+                    "target": "python",
+                    "args": ["-m", "test"],
+                },
+            ]
+        )
+    (content,) = store.values()
+    return content
+
+
+@pytest.fixture
+def seeded_config(config_store, seeded_config_content):
+    """Fixture that preloads the shared seeded config for read-only tests."""
+    config_store[_get_mcp_config_path()] = seeded_config_content
+    return config_store
 
 
 class TestMCPFunctions:
     """Test cases for MCP management functions."""
 
-    def test_load_config_nonexistent_file(self, temp_config_path):
+    def test_load_config_nonexistent_file(self, config_store):
         """Test loading config when file doesn't exist."""
         config = load_mcp_config()
-        assert config.to_dict() == {"mcpServers": {}}
+        assert config.mcpServers == {}
 
     def test_load_config_valid_file(self, temp_config_path):
         """Test loading config from valid JSON file."""
-        test_config = {
-            "mcpServers": {"test_server": {"command": "test", "transport": "stdio"}}
-        }
-        temp_config_path.write_text(json.dumps(test_config))
+        temp_config_path.write_text(_STDIO_CONFIG_JSON)
 
         config = load_mcp_config()
         # Check that the server was loaded correctly
-        servers_dict = config.to_dict()["mcpServers"]
-        assert "test_server" in servers_dict
-        assert servers_dict["test_server"]["command"] == "test"
-        assert servers_dict["test_server"]["transport"] == "stdio"
+        server = config.mcpServers["test_server"]
+        assert isinstance(server, StdioMCPServer)
+        assert server.command == "test"
+        assert server.transport == "stdio"
 
     def test_load_config_missing_mcp_servers_key(self, temp_config_path):
         """Test loading config that's missing mcpServers key."""
-        test_config = {"other_key": "value"}
-        temp_config_path.write_text(json.dumps(test_config))
-
-        config = load_mcp_config()
-        config_dict = config.to_dict()
-        assert "mcpServers" in config_dict
-        assert config_dict["mcpServers"] == {}
-
-    def test_load_config_invalid_json(self, temp_config_path):
-        """Test loading config with invalid JSON."""
-        temp_config_path.write_text("invalid json content")
-
-        with pytest.raises(MCPConfigurationError):
-            load_mcp_config()
-
-    def test_add_server_stdio(self, temp_config_path):
-        """Test adding a stdio MCP server."""
-        add_server(
-            "test",
-            "stdio",
-            "python",
-            args=["-m", "test"],
-            env_vars=["VAR1=value1", "VAR2=value2"],
-        )
+        temp_config_path.write_text(_MISSING_SERVERS_CONFIG_JSON)
 
-        # Verify server was added
         config = load_mcp_config()
-        servers_dict = config.to_dict()["mcpServers"]
-        assert "test" in servers_dict
-        server = servers_dict["test"]
-        assert server["command"] == "python"
-        assert server["args"] == ["-m", "test"]
-        assert server["env"]["VAR1"] == "value1"
-        assert server["env"]["VAR2"] == "value2"
-
-    def test_add_server_http(self, temp_config_path):
-        """Test adding an HTTP MCP server."""
-        add_server(
-            "test",
-            "http",
-            "https://example.com",
-            headers=["Authorization: Bearer token", "Content-Type: application/json"],
-        )
-
-        # Verify server was added
-        config = load_mcp_config()
-        servers_dict = config.to_dict()["mcpServers"]
-        assert "test" in servers_dict
-        server = servers_dict["test"]
-        assert server["url"] == "https://example.com"
-        assert server["headers"]["Authorization"] == "Bearer token"
-        assert server["headers"]["Content-Type"] == "application/json"
-
-    def test_add_server_oauth(self, temp_config_path):
-        """Test adding an OAuth MCP server."""
-        add_server(
-            "test",
-            "http",
-            "https://example.com",
-            auth="oauth",
-        )
-
-        # Verify server was added
-        config = load_mcp_config()
-        servers_dict = config.to_dict()["mcpServers"]
-        assert "test" in servers_dict
-        server = servers_dict["test"]
-        assert server["url"] == "https://example.com"
-        assert server["auth"] == "oauth"
-
-    def test_add_server_duplicate(self, temp_config_path):
+        assert config.mcpServers == {}
+
+    @pytest.mark.parametrize(
+        "kwargs,expected",
+        [
+            pytest.param(
+                dict(
+                    name="test",
+                    transport="stdio",
+                    target="python",
+                    args=["-m", "test"],
+                    env_vars=["VAR1=value1", "VAR2=value2"],
+                ),
+                {
+                    "command": "python",
+                    "args": ["-m", "test"],
+                    "env": {"VAR1": "value1", "VAR2": "value2"},
+                },
+                id="stdio",
+            ),
+            pytest.param(
+                dict(
+                    name="test_server",
+                    transport="stdio",
+                    target="python",
+                    args=["-m", "test_module"],
+                    env_vars=["API_KEY=secret123", "DEBUG=true"],
+                ),
+                {"env": {"API_KEY": "secret123", "DEBUG": "true"}},
+                id="stdio-env-vars",
+            ),
+            pytest.param(
+                dict(
+                    name="test",
+                    transport="http",
+                    target="https://example.com",
+                    headers=[
+                        "Authorization: Bearer token",
+                        "Content-Type: application/json",
+                    ],
+                ),
+                {
+                    "url": "https://example.com",
+                    "headers": {
+                        "Authorization": "Bearer token",
+                        "Content-Type": "application/json",
+                    },
+                },
+                id="http",
+            ),
+            pytest.param(
+                dict(
+                    name="test",
+                    transport="http",
+                    target="https://example.com",
+                    auth="oauth",
+                ),
+                {"url": "https://example.com", "auth": "oauth"},
+                id="oauth",
+            ),
+            pytest.param(
+                dict(
+                    name="notion_server",
+                    transport="http",
+                    target="https://api.notion.com",
+                    auth="oauth",
+                ),
+                {"url": "https://api.notion.com", "auth": "oauth"},
+                id="notion-oauth",
+            ),
+            pytest.param(
+                dict(
+                    name="test",
+                    transport="http",
+                    target="https://example.com",
+                    enabled=True,
+                ),
+                {"enabled": True},
+                id="enabled",
+            ),
+            pytest.param(
+                dict(
+                    name="test",
+                    transport="http",
+                    target="https://example.com",
+                    enabled=False,
+                ),
+                {"enabled": False},
+                id="disabled",
+            ),
+        ],
+    )
+    def test_add_server(self, config_store, kwargs, expected):
+        """Test adding MCP servers with each transport and option."""
+        add_server(**kwargs)
+
+        # Verify server was added with the expected fields
+        assert server_exists(kwargs["name"])
+        assert is_server_enabled(kwargs["name"]) is kwargs.get("enabled", True)
+        server = load_mcp_config().mcpServers[kwargs["name"]]
+        for field, value in expected.items():
+            assert getattr(server, field) == value
+
+    def test_add_server_duplicate(self, config_store):
         """Test adding a server with duplicate name."""
         add_server("test", "http", "https://example.com")
 
-        with pytest.raises(MCPConfigurationError, match="already exists"):
+        with pytest.raises(MCPConfigurationError, match=_ALREADY_EXISTS):
             add_server("test", "http", "https://example.com")
 
-    def test_add_server_invalid_transport(self, temp_config_path):
+    def test_add_servers_duplicate_saves_nothing(self, config_store):
+        """Test that a batch with a duplicate name leaves the config untouched."""
+        with pytest.raises(MCPConfigurationError, match=_ALREADY_EXISTS):
+            add_servers(
+                [
+                    {"name": "test", "transport": "http", "target": "https://a.com"},
+                    {"name": "test", "transport": "http", "target": "https://b.com"},
+                ]
+            )
+
+        assert list_servers() == {}
+
+    @pytest.mark.parametrize(
+        "spec,error",
+        [
+            ({"transport": "http"}, _MISSING_KEYS),
+            (
+                {
+                    "name": "test",
+                    "transport": "stdio",
+                    "target": "python",
+                    "command": "python",
+                },
+                _UNKNOWN_KEYS,
+            ),
+        ],
+        ids=["missing_keys", "unknown_keys"],
+    )
+    def test_add_servers_invalid_spec(self, config_store, spec, error):
+        """Test that malformed specs raise MCPConfigurationError and save nothing."""
+        with pytest.raises(MCPConfigurationError, match=error):
+            add_servers([spec])
+
+        assert list_servers() == {}
+
+    def test_add_server_invalid_transport(self, config_store):
         """Test adding server with invalid transport."""
-        with pytest.raises(MCPConfigurationError, match="Invalid transport type"):
+        with pytest.raises(MCPConfigurationError, match=_INVALID_TRANSPORT):
             add_server("test", "invalid", "target")
 
-    def test_remove_server_success(self, temp_config_path):
+    def test_remove_server_success(self, config_store):
         """Test removing an existing server."""
         add_server("test", "http", "https://example.com")
         remove_server("test")
 
         # Verify server was removed
         config = load_mcp_config()
-        servers_dict = config.to_dict()["mcpServers"]
-        assert "test" not in servers_dict
+        assert "test" not in config.mcpServers
 
-    def test_remove_server_nonexistent(self, temp_config_path):
+    def test_remove_server_nonexistent(self, config_store):
         """Test removing a non-existent server."""
-        with pytest.raises(MCPConfigurationError, match="not found"):
+        with pytest.raises(MCPConfigurationError, match=_NOT_FOUND):
             remove_server("nonexistent")
 
-    def test_list_servers_empty(self, temp_config_path):
+    def test_list_servers_empty(self, config_store):
         """Test listing servers when none exist."""
         servers = list_servers()
         assert servers == {}
 
-    def test_list_servers_with_data(self, temp_config_path):
+    def test_list_servers_with_data(self, seeded_config):
         """Test listing servers with existing data."""
-        add_server(
-            "test1",
-            "stdio",
-            "python",
-        )
-        add_server(
-            "test2",
-            "http",
-            "https://example.com",
-        )
-
         servers = list_servers()
         assert len(servers) == 2
-        assert "test1" in servers
-        assert "test2" in servers
+        assert "stdio_server" in servers
+        assert "test" in servers
         # Check that we get FastMCP server objects
-        assert isinstance(servers["test1"], StdioMCPServer)
-        assert isinstance(servers["test2"], RemoteMCPServer)
+        assert isinstance(servers["stdio_server"], StdioMCPServer)
+        assert isinstance(servers["test"], RemoteMCPServer)
 
-    def test_get_server_success(self, temp_config_path):
+    def test_get_server_success(self, seeded_config):
         """Test getting an existing server."""
-        add_server("test", "http", "https://example.com")
         server = get_server("test")
 
         # Check that we get a FastMCP server object
@@ -193,47 +325,20 @@ class TestMCPFunctions:
         assert server.url == "https://example.com"
         assert server.transport == "http"
 
-    def test_get_server_nonexistent(self, temp_config_path):
+    def test_get_server_nonexistent(self, config_store):
         """Test getting a non-existent server."""
-        with pytest.raises(MCPConfigurationError, match="not found"):
+        with pytest.raises(MCPConfigurationError, match=_NOT_FOUND):
             get_server("nonexistent")
 
-    def test_server_exists_true(self, temp_config_path):
+    def test_server_exists_true(self, seeded_config):
         """Test server_exists returns True for existing server."""
-        add_server("test", "http", "https://example.com")
         assert server_exists("test") is True
 
-    def test_server_exists_false(self, temp_config_path):
+    def test_server_exists_false(self, config_store):
         """Test server_exists returns False for non-existent server."""
         assert server_exists("nonexistent") is False
 
-    def test_server_exists_invalid_config(self, temp_config_path):
-        """Test server_exists returns False when config is invalid."""
-        temp_config_path.write_text("invalid json")
-        assert server_exists("test") is False
-
-    def test_add_server_stdio_with_env_vars(self, temp_config_path):
-        """Test adding stdio server with environment variables."""
-        add_server(
-            "test_server",
-            "stdio",
-            "python",
-            args=["-m", "test_module"],
-            env_vars=["API_KEY=secret123", "DEBUG=true"],
-        )
-        assert server_exists("test_server")
-
-    def test_add_server_notion_oauth(self, temp_config_path):
-        """Test adding Notion server with OAuth."""
-        add_server(
-            "notion_server",
-            "http",
-            "https://api.notion.com",
-            auth="oauth",
-        )
-        assert server_exists("notion_server")
-
-    def test_get_config_status_nonexistent(self, temp_config_path):
+    def test_get_config_status_nonexistent(self, config_store):
         """Test get_config_status when config file doesn't exist."""
         status = get_config_status()
         assert status["exists"] is False
@@ -241,41 +346,15 @@ class TestMCPFunctions:
         assert status["servers"] == {}
         assert "not found" in status["message"]
 
-    def test_get_config_status_valid(self, temp_config_path):
+    def test_get_config_status_valid(self, seeded_config):
         """Test get_config_status with valid config file."""
-        add_server("test_server", "http", "https://example.com")
-
         status = get_config_status()
         assert status["exists"] is True
         assert status["valid"] is True
-        assert "test_server" in status["servers"]
-        assert "1 server(s)" in status["message"]
-
-    def test_get_config_status_invalid(self, temp_config_path):
-        """Test get_config_status with invalid config file."""
-        temp_config_path.write_text("invalid json content")
-
-        status = get_config_status()
-        assert status["exists"] is True
-        assert status["valid"] is False
-        assert status["servers"] == {}
-        assert "Invalid" in status["message"]
-
-    def test_add_server_with_enabled_flag(self, temp_config_path):
-        """Test adding a server with enabled flag set to True."""
-        add_server("test", "http", "https://example.com", enabled=True)
+        assert "test" in status["servers"]
+        assert "2 server(s)" in status["message"]
 
-        assert server_exists("test")
-        assert is_server_enabled("test") is True
-
-    def test_add_server_with_disabled_flag(self, temp_config_path):
-        """Test adding a server with enabled flag set to False."""
-        add_server("test", "http", "https://example.com", enabled=False)
-
-        assert server_exists("test")
-        assert is_server_enabled("test") is False
-
-    def test_enable_server_success(self, temp_config_path):
+    def test_enable_server_success(self, config_store):
         """Test enabling a disabled server."""
         # Add a disabled server
         add_server("test", "http", "https://example.com", enabled=False)
@@ -285,12 +364,12 @@ class TestMCPFunctions:
         enable_server("test")
         assert is_server_enabled("test") is True
 
-    def test_enable_server_nonexistent(self, temp_config_path):
+    def test_enable_server_nonexistent(self, config_store):
         """Test enabling a non-existent server."""
-        with pytest.raises(MCPConfigurationError, match="not found"):
+        with pytest.raises(MCPConfigurationError, match=_NOT_FOUND):
             enable_server("nonexistent")
 
-    def test_disable_server_success(self, temp_config_path):
+    def test_disable_server_success(self, config_store):
         """Test disabling an enabled server."""
         # Add an enabled server
         add_server("test", "http", "https://example.com", enabled=True)
@@ -300,36 +379,81 @@ class TestMCPFunctions:
         disable_server("test")
         assert is_server_enabled("test") is False
 
-    def test_disable_server_nonexistent(self, temp_config_path):
+    def test_disable_server_nonexistent(self, config_store):
         """Test disabling a non-existent server."""
-        with pytest.raises(MCPConfigurationError, match="not found"):
+        with pytest.raises(MCPConfigurationError, match=_NOT_FOUND):
             disable_server("nonexistent")
 
-    def test_is_server_enabled_default(self, temp_config_path):
+    @pytest.mark.parametrize("enabled", [True, False])
+    def test_set_server_enabled(self, config_store, enabled):
+        """Test setting the enabled state directly."""
+        add_server("test", "stdio", "python", enabled=not enabled)
+
+        set_server_enabled("test", enabled)
+        assert is_server_enabled("test") is enabled
+        # Other server fields survive the update
+        assert get_server("test").model_dump()["command"] == "python"
+
+    def test_set_server_enabled_nonexistent(self, config_store):
+        """Test setting the enabled state of a non-existent server."""
+        with pytest.raises(MCPConfigurationError, match=_NOT_FOUND):
+            set_server_enabled("nonexistent", True)
+
+    def test_is_server_enabled_default(self, seeded_config):
         """Test that servers without enabled field default to True."""
-        # Add server without explicit enabled flag (defaults to True)
-        add_server("test", "http", "https://example.com")
+        # Seeded servers are added without an explicit enabled flag (defaults to True)
         assert is_server_enabled("test") is True
 
-    def test_is_server_enabled_nonexistent(self, temp_config_path):
+    def test_is_server_enabled_nonexistent(self, config_store):
         """Test is_server_enabled returns False for non-existent server."""
         assert is_server_enabled("nonexistent") is False
 
-    def test_list_enabled_servers_all_enabled(self, temp_config_path):
+    def test_list_enabled_servers_all_enabled(self, config_store):
         """Test listing enabled servers when all are enabled."""
-        add_server("test1", "http", "https://example1.com", enabled=True)
-        add_server("test2", "http", "https://example2.com", enabled=True)
+        add_servers(
+            [
+                {
+                    "name": "test1",
+                    "transport": "http",
+                    "target": "https://example1.com",
+                },
+                {
+                    "name": "test2",
+                    "transport": "http",
+                    "target": "https://example2.com",
+                },
+            ]
+        )
 
         enabled_servers = list_enabled_servers()
         assert len(enabled_servers) == 2
         assert "test1" in enabled_servers
         assert "test2" in enabled_servers
 
-    def test_list_enabled_servers_mixed(self, temp_config_path):
+    def test_list_enabled_servers_mixed(self, config_store):
         """Test listing enabled servers when some are disabled."""
-        add_server("enabled1", "http", "https://example1.com", enabled=True)
-        add_server("disabled", "http", "https://example2.com", enabled=False)
-        add_server("enabled2", "http", "https://example3.com", enabled=True)
+        add_servers(
+            [
+                {
+                    "name": "enabled1",
+                    "transport": "http",
+                    "target": "https://example1.com",
+                    "enabled": True,
+                },
+                {
+                    "name": "disabled",
+                    "transport": "http",
+                    "target": "https://example2.com",
+                    "enabled": False,
+                },
+                {
+                    "name": "enabled2",
+                    "transport": "http",
+                    "target": "https://example3.com",
+                    "enabled": True,
+                },
+            ]
+        )
 
         enabled_servers = list_enabled_servers()
         assert len(enabled_servers) == 2
@@ -337,37 +461,98 @@ class TestMCPFunctions:
         assert "enabled2" in enabled_servers
         assert "disabled" not in enabled_servers
 
-    def test_list_enabled_servers_all_disabled(self, temp_config_path):
+    def test_list_enabled_servers_all_disabled(self, config_store):
         """Test listing enabled servers when all are disabled."""
-        add_server("test1", "http", "https://example1.com", enabled=False)
-        add_server("test2", "http", "https://example2.com", enabled=False)
+        add_servers(
+            [
+                {
+                    "name": "test1",
+                    "transport": "http",
+                    "target": "https://example1.com",
+                    "enabled": False,
+                },
+                {
+                    "name": "test2",
+                    "transport": "http",
+                    "target": "https://example2.com",
+                    "enabled": False,
+                },
+            ]
+        )
 
         enabled_servers = list_enabled_servers()
         assert len(enabled_servers) == 0
 
-    def test_list_enabled_servers_empty(self, temp_config_path):
+    def test_list_enabled_servers_empty(self, config_store):
         """Test listing enabled servers when none exist."""
         enabled_servers = list_enabled_servers()
         assert len(enabled_servers) == 0
 
-    def test_enable_disable_toggle(self, temp_config_path):
-        """Test toggling server enabled state multiple times."""
+    def test_enable_disable_toggle(self, config_store):
+        """Test toggling server enabled state multiple times in one transaction."""
         add_server("test", "http", "https://example.com", enabled=True)
 
         # Initially enabled
         assert is_server_enabled("test") is True
 
-        # Disable
-        disable_server("test")
+        with mcp_config_transaction() as config:
+            # Disable, enable again, then disable again
+            disable_server("test", config)
+            assert getattr(config.mcpServers["test"], "enabled") is False
+            enable_server("test", config)
+            assert getattr(config.mcpServers["test"], "enabled") is True
+            disable_server("test", config)
+
+            # Nothing is saved until the transaction ends
+            assert is_server_enabled("test") is True
+
         assert is_server_enabled("test") is False
 
-        # Enable again
-        enable_server("test")
+    def test_transaction_not_saved_on_error(self, config_store):
+        """Test that a failed transaction leaves the saved config untouched."""
+        add_server("test", "http", "https://example.com", enabled=True)
+
+        with pytest.raises(MCPConfigurationError, match=_NOT_FOUND):
+            with mcp_config_transaction() as config:
+                disable_server("test", config)
+                enable_server("nonexistent", config)
+
         assert is_server_enabled("test") is True
 
-        # Disable again
-        disable_server("test")
-        assert is_server_enabled("test") is False
+
+class TestInvalidConfig:
+    """Test cases for reading an invalid configuration file."""
+
+    @pytest.fixture(scope="class")
+    def invalid_config_dir(self, tmp_path_factory):
+        """Fixture that writes one invalid config file for the whole class."""
+        config_dir = tmp_path_factory.mktemp("invalid_mcp")
+        (config_dir / "mcp.json").write_text("invalid json content")
+        return config_dir
+
+    @pytest.fixture(autouse=True)
+    def _use_invalid_config(self, invalid_config_dir, monkeypatch):
+        """Point PERSISTENCE_DIR at the invalid config for each test."""
+        monkeypatch.setattr(
+            "openhands_cli.locations.PERSISTENCE_DIR", str(invalid_config_dir)
+        )
+
+    def test_load_config_invalid_json(self):
+        """Test loading config with invalid JSON."""
+        with pytest.raises(MCPConfigurationError):
+            load_mcp_config()
+
+    def test_server_exists_invalid_config(self):
+        """Test server_exists returns False when config is invalid."""
+        assert server_exists("test") is False
+
+    def test_get_config_status_invalid(self):
+        """Test get_config_status with invalid config file."""
+        status = get_config_status()
+        assert status["exists"] is True
+        assert status["valid"] is False
+        assert status["servers"] == {}
+        assert "Invalid" in status["message"]
 
 
 class TestParseHelpers:
@@ -375,13 +560,19 @@ class TestParseHelpers:
 
     def test_parse_headers_valid(self):
         """Test parsing valid headers."""
-        headers = ["Authorization: Bearer token", "Content-Type: application/json"]
-        parsed = _parse_headers(headers)
+        parsed = _parse_headers(list(_VALID_HEADERS))
         assert parsed == {
             "Authorization": "Bearer token",
             "Content-Type": "application/json",
         }
 
+    def test_parse_headers_many(self):
+        """Test parsing many headers, keeping separators inside values."""
+        headers = [f"X-Header-{i}: value:{i}" for i in range(100)]
+        parsed = _parse_headers(headers)
+        assert len(parsed) == 100
+        assert parsed["X-Header-42"] == "value:42"
+
     def test_parse_headers_empty(self):
         """Test parsing empty headers."""
         assert _parse_headers(None) == {}
@@ -390,15 +581,21 @@ class TestParseHelpers:
     def test_parse_headers_invalid_format(self):
         """Test parsing headers with invalid format."""
         headers = ["invalid_header_format"]
-        with pytest.raises(MCPConfigurationError, match="Invalid header format"):
+        with pytest.raises(MCPConfigurationError, match=_INVALID_HEADER):
             _parse_headers(headers)
 
     def test_parse_env_vars_valid(self):
         """Test parsing valid environment variables."""
-        env_vars = ["VAR1=value1", "VAR2=value2"]
-        parsed = _parse_env_vars(env_vars)
+        parsed = _parse_env_vars(list(_VALID_ENV_VARS))
         assert parsed == {"VAR1": "value1", "VAR2": "value2"}
 
+    def test_parse_env_vars_many(self):
+        """Test parsing many env vars, keeping separators inside values."""
+        env_vars = [f"VAR{i}=a=b{i}" for i in range(100)]
+        parsed = _parse_env_vars(env_vars)
+        assert len(parsed) == 100
+        assert parsed["VAR42"] == "a=b42"
+
     def test_parse_env_vars_empty(self):
         """Test parsing empty environment variables."""
         assert _parse_env_vars(None) == {}
@@ -407,7 +604,5 @@ class TestParseHelpers:
     def test_parse_env_vars_invalid_format(self):
         """Test parsing environment variables with invalid format."""
         env_vars = ["invalid_env_format"]
-        with pytest.raises(
-            MCPConfigurationError, match="Invalid environment variable format"
-        ):
+        with pytest.raises(MCPConfigurationError, match=_INVALID_ENV_VAR):
             _parse_env_vars(env_vars)
@@ -8,7 +8,11 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from openhands_cli import simple_main
-from openhands_cli.argparsers.main_parser import create_main_parser
+from openhands_cli.argparsers.main_parser import (
+    _build_main_parser,
+    create_main_parser,
+    parse_main_args,
+)
 from openhands_cli.simple_main import main
 
 
@@ -32,6 +36,15 @@ def test_main_parser_accepts_task_and_file_flags():
     assert args.file == "README.md"
 
 
+def test_main_parser_is_built_once():
+    assert create_main_parser() is create_main_parser()
+
+    # Parsing with the shared parser must not leak state between calls
+    parser = create_main_parser()
+    assert parser.parse_args(["--task", "first"]).task == "first"
+    assert parser.parse_args([]).task is None
+
+
 class TestMainEntryPoint:
     """Test the main entry point behavior."""
 
@@ -482,3 +495,15 @@ def test_handle_cloud_command_no_initial_message(monkeypatch):
                 if "Error: No initial message" in str(call)
             ]
             assert len(error_calls) > 0
+
+
+def test_version_flag_skips_building_parser(capsys):
+    """A lone version flag is answered without constructing the parser."""
+    _build_main_parser.cache_clear()
+
+    with pytest.raises(SystemExit) as exc:
+        parse_main_args(["--version"])
+
+    assert exc.value.code == 0
+    assert "OpenHands CLI" in capsys.readouterr().out
+    assert _build_main_parser.cache_info().currsize == 0